@@ -0,0 +1,230 @@
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import zipfile
+from urllib.parse import urljoin, urlparse
+
+# 支持抽取文本的附件格式
+ATTACHMENT_EXTENSIONS = ('.pdf', '.docx', '.doc', '.wps')
+
+# 单个附件的下载上限（字节），超过即中止下载
+MAX_ATTACHMENT_BYTES = 30 * 1024 * 1024
+
+# 附件保存目录
+ATTACHMENT_DIR = 'attachments'
+
+# 等待单个附件抽取结果的最长时间（秒），超时视为工作进程卡死
+EXTRACTION_TIMEOUT = 600
+
+# DOC/WPS转换工具及其UTF-8输出参数，默认输出随系统区域设置变化，中文可能变成乱码或问号
+LEGACY_DOC_TOOLS = (
+    ('antiword', ['-m', 'UTF-8.txt']),
+    ('catdoc', ['-d', 'utf-8']),
+)
+
+def find_attachment_links(soup, page_url):
+    """在详情页中查找PDF/DOC/DOCX/WPS附件链接"""
+    attachments = []
+    seen = set()
+    for link in soup.find_all('a', href=True):
+        href = link['href'].strip()
+        full_url = urljoin(page_url, href)
+        path = urlparse(full_url).path.lower()
+        if not path.endswith(ATTACHMENT_EXTENSIONS) or full_url in seen:
+            continue
+        seen.add(full_url)
+        name = link.get_text().strip() or os.path.basename(urlparse(full_url).path)
+        attachments.append({
+            'name': name,
+            'url': full_url,
+            'format': os.path.splitext(path)[1].lstrip('.')
+        })
+    return attachments
+
+def download_attachment(url, headers, max_bytes=MAX_ATTACHMENT_BYTES, dest_dir=ATTACHMENT_DIR):
+    """流式下载附件，超过大小上限时放弃，返回本地路径或None
+
+    已下载过的附件用保存的ETag/Last-Modified发送条件请求，服务器返回304时沿用本地文件，附件被替换时重新下载。
+    """
+    from craw_final import fetch_page, finish_fetch
+
+    os.makedirs(dest_dir, exist_ok=True)
+    suffix = os.path.splitext(urlparse(url).path)[1].lower()
+    path = os.path.join(dest_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + suffix)
+    meta_path = path + '.meta'
+
+    request_headers = dict(headers)
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            validators = json.load(f)
+        if validators.get('etag'):
+            request_headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            request_headers['If-Modified-Since'] = validators['last_modified']
+
+    with fetch_page(url, request_headers, timeout=30, stream=True) as response:
+        if response.status_code == 304:
+            finish_fetch(response, 0)
+            return path
+        if response.status_code != 200:
+            finish_fetch(response, 0)
+            print(f"✗ 附件无法访问: {response.status_code} {url}")
+            return None
+        declared = response.headers.get('Content-Length')
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            finish_fetch(response, 0)
+            print(f"✗ 附件过大({int(declared) // 1024} KB)，跳过: {url}")
+            return None
+
+        received = 0
+        tmp_path = path + '.part'
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                received += len(chunk)
+                if received > max_bytes:
+                    break
+                f.write(chunk)
+        finish_fetch(response, received)
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+
+    if received > max_bytes:
+        os.remove(tmp_path)
+        print(f"✗ 附件超过 {max_bytes // 1024} KB 上限，已中止: {url}")
+        return None
+    os.replace(tmp_path, path)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(validators, f)
+    return path
+
+def extract_pdf_text(path):
+    """抽取PDF文本，优先使用pdfminer，其次pypdf"""
+    try:
+        from pdfminer.high_level import extract_text
+        return extract_text(path), 'pdfminer'
+    except ImportError:
+        pass
+    try:
+        from pypdf import PdfReader
+        reader = PdfReader(path)
+        return '\n'.join(page.extract_text() or '' for page in reader.pages), 'pypdf'
+    except ImportError:
+        return '', 'unavailable'
+
+def extract_docx_text(path):
+    """抽取DOCX文本，直接解析word/document.xml，无需额外依赖"""
+    with zipfile.ZipFile(path) as archive:
+        xml = archive.read('word/document.xml').decode('utf-8', errors='replace')
+    paragraphs = []
+    for para in re.findall(r'<w:p[ >].*?</w:p>', xml, re.S):
+        text = html.unescape(''.join(re.findall(r'<w:t[^>]*>([^<]*)</w:t>', para)))
+        if text.strip():
+            paragraphs.append(text)
+    return '\n'.join(paragraphs), 'docx-xml'
+
+def extract_legacy_doc_text(path):
+    """借助本地转换工具抽取DOC/WPS文本（antiword、catdoc或LibreOffice）"""
+    for tool, options in LEGACY_DOC_TOOLS:
+        if shutil.which(tool):
+            result = subprocess.run([tool] + options + [path], capture_output=True, timeout=120)
+            if result.returncode == 0 and result.stdout.strip():
+                return result.stdout.decode('utf-8', errors='replace'), tool
+
+    soffice = shutil.which('soffice') or shutil.which('libreoffice')
+    if soffice:
+        with tempfile.TemporaryDirectory() as out_dir:
+            subprocess.run(
+                [soffice, '--headless', '--convert-to', 'txt:Text (encoded):UTF8', '--outdir', out_dir, path],
+                capture_output=True, timeout=300
+            )
+            txt_path = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + '.txt')
+            if os.path.exists(txt_path):
+                with open(txt_path, 'r', encoding='utf-8', errors='replace') as f:
+                    return f.read(), 'soffice'
+    return '', 'unavailable'
+
+def extract_attachment_text(path):
+    """按格式抽取附件文本，返回 (文本, 抽取器名称)，供进程池调用"""
+    suffix = os.path.splitext(path)[1].lower()
+    try:
+        if suffix == '.pdf':
+            text, extractor = extract_pdf_text(path)
+        elif suffix == '.docx':
+            text, extractor = extract_docx_text(path)
+        elif suffix in ('.doc', '.wps'):
+            text, extractor = extract_legacy_doc_text(path)
+        else:
+            return '', 'unsupported'
+    except Exception as e:
+        return '', f'error: {e}'
+    return text.strip(), extractor
+
+def create_extraction_pool(max_workers=None):
+    """创建附件文本抽取进程池，与下载线程分离，避免解析阻塞抓取"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=max_workers or max(1, (os.cpu_count() or 2) - 1))
+
+def submit_attachments(pool, policy_info, attachments, headers):
+    """下载详情页附件并提交抽取任务，返回 [(附件信息, future)]"""
+    pending = []
+    for attachment in attachments:
+        try:
+            path = download_attachment(attachment['url'], headers)
+        except Exception as e:
+            print(f"✗ 下载附件失败: {e}")
+            continue
+        if path:
+            try:
+                future = pool.submit(extract_attachment_text, path)
+            except Exception as e:
+                # 进程池已损坏时记录为失败，由 merge_attachment_text 统一处理并重建进程池
+                from concurrent.futures import Future
+
+                future = Future()
+                future.set_exception(e)
+            pending.append((attachment, future))
+    return pending
+
+def merge_attachment_text(policy_info, pending, timeout=EXTRACTION_TIMEOUT):
+    """等待抽取结果，将附件文本连同来源信息合并进 content
+
+    单个附件抽取失败只记录在 attachments 中，不影响政策本身；返回进程池是否需要重建
+    （工作进程崩溃或超时后进程池不能继续使用）。
+    """
+    from concurrent.futures import TimeoutError
+    from concurrent.futures.process import BrokenProcessPool
+
+    sources = []
+    pool_broken = False
+    for attachment, future in pending:
+        try:
+            text, extractor = future.result(timeout=0 if pool_broken else timeout)
+        except (BrokenProcessPool, TimeoutError) as e:
+            text, extractor = '', f'error: {type(e).__name__}'
+            pool_broken = True
+        except Exception as e:
+            text, extractor = '', f'error: {e}'
+        if extractor.startswith('error'):
+            print(f"✗ 附件抽取失败 {attachment['url']}: {extractor}")
+        sources.append({
+            'name': attachment['name'],
+            'url': attachment['url'],
+            'format': attachment['format'],
+            'extractor': extractor,
+            'length': len(text)
+        })
+        if text:
+            policy_info['content'] += f"\n\n【附件】{attachment['name']}\n【附件链接】{attachment['url']}\n{text}"
+
+    if sources:
+        policy_info['attachments'] = sources
+        policy_info['content_length'] = len(policy_info['content'])
+    return pool_broken
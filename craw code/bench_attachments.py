@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from attachments import ATTACHMENT_EXTENSIONS, extract_attachment_text
+
+def measure_extraction(path):
+    """在工作进程中抽取单个附件，返回字符数、耗时与峰值内存(KB)
+
+    DOC/WPS 由 antiword、catdoc 或 LibreOffice 子进程转换，峰值内存取工作进程与其已结束子进程中的较大值。
+    """
+    import resource
+
+    start = time.perf_counter()
+    text, extractor = extract_attachment_text(path)
+    elapsed = time.perf_counter() - start
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return len(text), elapsed, peak_kb, extractor
+
+def collect_fixtures(fixture_dir):
+    """按格式收集样本附件"""
+    fixtures = {}
+    for root, _, files in os.walk(fixture_dir):
+        for name in files:
+            suffix = os.path.splitext(name)[1].lower()
+            if suffix in ATTACHMENT_EXTENSIONS:
+                fixtures.setdefault(suffix, []).append(os.path.join(root, name))
+    return fixtures
+
+def bench_attachments(fixture_dir):
+    """对样本集逐格式测量附件抽取吞吐量与内存上限"""
+    fixtures = collect_fixtures(fixture_dir)
+    if not fixtures:
+        print(f"在 {fixture_dir} 中没有找到附件样本")
+        return
+
+    print(f"{'格式':<6}{'文件数':>6}{'大小(MB)':>10}{'MB/s':>8}{'字符/s':>12}{'峰值内存(MB)':>14}  抽取器")
+    for suffix, paths in sorted(fixtures.items()):
+        total_bytes = sum(os.path.getsize(p) for p in paths)
+        # 每种格式使用独立的单进程池，峰值内存即该格式的内存上限
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results = list(pool.map(measure_extraction, paths))
+        total_chars = sum(r[0] for r in results)
+        total_time = sum(r[1] for r in results) or 1e-9
+        peak_mb = max(r[2] for r in results) / 1024
+        extractors = sorted({r[3] for r in results})
+        print(f"{suffix:<6}{len(paths):>6}{total_bytes / 1048576:>10.2f}"
+              f"{total_bytes / 1048576 / total_time:>8.2f}{total_chars / total_time:>12.0f}"
+              f"{peak_mb:>14.1f}  {', '.join(extractors)}")
+
+if __name__ == "__main__":
+    bench_attachments(sys.argv[1] if len(sys.argv) > 1 else 'fixtures/attachments')
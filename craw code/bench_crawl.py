@@ -0,0 +1,134 @@
+import argparse
+import difflib
+import glob
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from replay_server import start_replay_server
+
+CRAWL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 子进程中运行爬虫的驱动代码，关闭礼貌延迟以测量纯处理能力
+DRIVER = '''
+import sys
+sys.path.insert(0, {crawl_dir!r})
+from craw_final import crawl_multiple_websites
+crawl_multiple_websites({websites_file!r}, request_delay=0)
+'''
+
+def run_crawler(websites_file, proxy_port, work_dir, verbose=False):
+    """在独立子进程中经回放代理运行完整爬虫，返回 (墙钟时间, CPU时间, 峰值内存MB, 返回码)"""
+    env = dict(os.environ)
+    proxy = f'http://127.0.0.1:{proxy_port}'
+    env.update({'HTTP_PROXY': proxy, 'HTTPS_PROXY': proxy, 'NO_PROXY': '', 'CRAWL_REPLAY': '1'})
+    driver = DRIVER.format(crawl_dir=CRAWL_DIR, websites_file=os.path.abspath(websites_file))
+
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    with open(os.path.join(work_dir, 'crawler_output.txt'), 'w', encoding='utf-8') as out:
+        result = subprocess.run(
+            [sys.executable, '-c', driver], cwd=work_dir, env=env,
+            stdout=None if verbose else out, stderr=subprocess.STDOUT
+        )
+    wall = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    # Linux 下 ru_maxrss 单位为KB，取所有已结束子进程中的最大值
+    peak_mb = after.ru_maxrss / 1024
+    return wall, cpu, peak_mb, result.returncode
+
+def count_fetched_pages(work_dir):
+    """根据结构化日志统计实际发出的请求数，包括详情页、订阅源、robots.txt与附件"""
+    log_file = os.path.join(work_dir, 'crawl_log.jsonl')
+    if not os.path.exists(log_file):
+        return 0
+    with open(log_file, 'r', encoding='utf-8') as f:
+        return sum(1 for line in f if json.loads(line).get('event') == 'fetch')
+
+def load_crawl_output(work_dir):
+    """读取本次爬取的最终JSON结果"""
+    files = sorted(glob.glob(os.path.join(work_dir, 'policies_all_websites_*.json')))
+    if not files:
+        return []
+    with open(files[-1], 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def score_extraction(results, golden, content_threshold=0.95):
+    """对照标准结果计算抽取准确率：召回率与各字段一致率"""
+    by_url = {p['url']: p for p in results}
+    fields = ('title', 'publication_date', 'source')
+    matches = {field: 0 for field in fields}
+    matches['content'] = 0
+    found = 0
+
+    for expected in golden:
+        actual = by_url.get(expected['url'])
+        if actual is None:
+            continue
+        found += 1
+        for field in fields:
+            if actual.get(field) == expected.get(field):
+                matches[field] += 1
+        ratio = difflib.SequenceMatcher(None, actual.get('content', ''), expected.get('content', '')).ratio()
+        if ratio >= content_threshold:
+            matches['content'] += 1
+
+    total = len(golden) or 1
+    scores = {'recall': found / total}
+    scores.update({field: count / total for field, count in matches.items()})
+    return scores
+
+def main():
+    parser = argparse.ArgumentParser(description='基于离线快照的端到端爬虫基准测试')
+    parser.add_argument('archive', help='crawl_archive.py 录制的归档文件')
+    parser.add_argument('--websites', default=os.path.join(CRAWL_DIR, 'websites.txt'))
+    parser.add_argument('--golden', help='标准抽取结果JSON，用于计算准确率')
+    parser.add_argument('--write-golden', help='把本次抽取结果写为标准结果（人工核对后提交）')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help='保留临时工作目录')
+    parser.add_argument('--verbose', action='store_true', help='显示爬虫输出')
+    args = parser.parse_args()
+
+    server, port = start_replay_server(args.archive, 0, args.latency, args.jitter, args.error_rate, args.seed)
+    work_dir = tempfile.mkdtemp(prefix='crawl_bench_')
+    try:
+        wall, cpu, peak_mb, returncode = run_crawler(args.websites, port, work_dir, args.verbose)
+        pages = count_fetched_pages(work_dir)
+        results = load_crawl_output(work_dir)
+
+        print(f"⏱️ 基准结果（延迟 {args.latency}s + 抖动 {args.jitter}s，错误率 {args.error_rate}）")
+        print(f"   退出码: {returncode}，HTTP请求: {pages}，抽取政策: {len(results)}")
+        print(f"   吞吐量: {pages / wall:.2f} 请求/s，墙钟 {wall:.2f}s")
+        print(f"   CPU时间: {cpu:.2f}s，每个请求 {cpu / max(pages, 1) * 1000:.1f} ms")
+        print(f"   峰值内存: {peak_mb:.1f} MB")
+
+        if args.golden:
+            with open(args.golden, 'r', encoding='utf-8') as f:
+                golden = json.load(f)
+            scores = score_extraction(results, golden)
+            print("   抽取准确率: " + '，'.join(f"{k} {v:.1%}" for k, v in scores.items()))
+
+        if args.write_golden:
+            fields = ('title', 'url', 'publication_date', 'source', 'content')
+            with open(args.write_golden, 'w', encoding='utf-8') as f:
+                json.dump([{k: p.get(k) for k in fields} for p in results], f, ensure_ascii=False, indent=2)
+            print(f"💾 标准结果已写入: {args.write_golden}")
+    finally:
+        server.shutdown()
+        if args.keep:
+            print(f"📁 工作目录: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CRAWL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 需要统计导入耗时的模块
+MODULES = [
+    'cli',
+    'craw_final',
+    'attachments',
+    'version_store',
+    'corpus_store',
+    'crawl_metrics',
+    'crawl_archive',
+    'discovery',
+    'policy_dates',
+    'partition_index',
+    'policy_tokenizer',
+    'crawl_scheduler',
+    'crawl_queue',
+    'distributed_crawl',
+]
+
+# 只在需要时才应导入的重量级依赖，出现在 import craw_final 中即视为回退
+HEAVY_MODULES = ['requests', 'bs4', 'zstandard', 'jieba', 'concurrent.futures', 'xml.etree.ElementTree', 'difflib', 'csv']
+
+def import_profile(module, runs=5):
+    """用 -X importtime 测量导入模块的累计耗时(ms)，取多次运行的中位数，并返回被导入的模块集合"""
+    totals = []
+    imported = set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=CRAWL_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"导入 {module} 失败: {result.stderr.strip().splitlines()[-1]}")
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            parts = line.split('|')
+            name = parts[2].strip()
+            imported.add(name)
+            if name == module:
+                totals.append(int(parts[1]) / 1000)
+    return statistics.median(totals), imported
+
+def command_wall_time(args, runs=10):
+    """测量一条命令从启动到退出的墙钟时间(ms)，取中位数"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=CRAWL_DIR, capture_output=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def bench_imports(runs=5):
+    lines = [f"Python {sys.version_info.major}.{sys.version_info.minor}，每项取 {runs} 次运行的中位数", '']
+    lines.append(f"{'模块':<20}{'导入耗时(ms)':>14}")
+    heavy_loaded = []
+    for module in MODULES:
+        try:
+            total, imported = import_profile(module, runs)
+        except RuntimeError as e:
+            lines.append(f"{module:<20}{'-':>14}  {e}")
+            continue
+        lines.append(f"{module:<20}{total:>14.1f}")
+        if module == 'craw_final':
+            heavy_loaded = [name for name in HEAVY_MODULES if name in imported]
+
+    lines.append('')
+    lines.append(f"import craw_final 时加载的重量级依赖: {', '.join(heavy_loaded) or '无'}")
+    lines.append('')
+    lines.append(f"{'命令':<28}{'启动到退出(ms)':>16}")
+    for label, args in (
+        ('python -c pass', ['-c', 'pass']),
+        ('python cli.py --help', ['cli.py', '--help']),
+        ('python cli.py stats', ['cli.py', 'stats']),
+    ):
+        lines.append(f"{label:<28}{command_wall_time(args, runs * 2):>16.1f}")
+    return '\n'.join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='统计各模块导入耗时与命令行启动时间')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--write', help='把结果写入文件，如 import_profile.txt')
+    args = parser.parse_args()
+
+    report = bench_imports(args.runs)
+    print(report)
+    if args.write:
+        with open(args.write, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+        print(f"\n📝 已写入: {args.write}")
@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+# 命令行入口只导入标准库中的轻量模块；requests、bs4、zstandard、jieba 等依赖在子命令真正需要时才导入，
+# 使 stats 这类查询命令在几十毫秒内返回
+
+CRAWL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BENCH_SCRIPTS = {
+    'crawl': 'bench_crawl.py',
+    'attachments': 'bench_attachments.py',
+    'corpus': 'corpus_store.py',
+    'imports': 'bench_imports.py',
+}
+
+def default_websites_file():
+    """优先使用当前目录下的 websites.txt，没有时使用脚本所在目录的网站列表"""
+    if os.path.exists('websites.txt'):
+        return 'websites.txt'
+    return os.path.join(CRAWL_DIR, 'websites.txt')
+
+def latest_progress_file(directory='.'):
+    """找到最后保存的进度文件，返回 (路径, 已完成的网站序号)"""
+    latest = None
+    for name in os.listdir(directory):
+        if name.startswith('progress_after_website_') and name.endswith('.json'):
+            index = name[len('progress_after_website_'):-len('.json')]
+            if index.isdigit() and (latest is None or int(index) > latest[1]):
+                latest = (os.path.join(directory, name), int(index))
+    return latest
+
+def cmd_crawl(args):
+    from craw_final import crawl_multiple_websites
+
+    crawl_multiple_websites(args.websites or default_websites_file(), request_delay=args.delay)
+
+def cmd_resume(args):
+    if args.progress:
+        name = os.path.basename(args.progress)
+        index = name[len('progress_after_website_'):-len('.json')]
+        if not index.isdigit():
+            print(f"无法从文件名识别网站序号: {args.progress}")
+            sys.exit(1)
+        progress = (args.progress, int(index))
+    else:
+        progress = latest_progress_file()
+        if progress is None:
+            print("当前目录下没有进度文件，请使用 crawl 重新开始")
+            sys.exit(1)
+
+    path, finished = progress
+    with open(path, 'r', encoding='utf-8') as f:
+        resume_data = json.load(f)
+    print(f"⏯️ 从 {path} 恢复 {len(resume_data)} 条记录，自第 {finished + 1} 个网站继续")
+
+    from craw_final import crawl_multiple_websites
+
+    crawl_multiple_websites(args.websites or default_websites_file(), request_delay=args.delay,
+                            resume_data=resume_data, start_index=finished + 1)
+
+def cmd_export(args):
+    from corpus_store import load_policies
+
+    policies = list(load_policies(args.source))
+    if args.format == 'all':
+        from craw_final import save_final_data
+
+        save_final_data(policies)
+    elif args.format == 'corpus':
+        from corpus_store import write_corpus
+
+        out_dir = args.out or f'policies_corpus_{time.strftime("%Y%m%d_%H%M%S")}'
+        write_corpus(policies, out_dir)
+        print(f"📦 已导出 {len(policies)} 条到压缩语料库: {out_dir}")
+    else:
+        out_file = args.out or f'policies_{time.strftime("%Y%m%d_%H%M%S")}.jsonl'
+        with open(out_file, 'w', encoding='utf-8') as f:
+            for policy in policies:
+                f.write(json.dumps(policy, ensure_ascii=False) + '\n')
+        print(f"📄 已导出 {len(policies)} 条到: {out_file}")
+
+def cmd_stats(args):
+    """汇总版本库、分区索引与调度状态，只读取SQLite与JSON，不导入爬虫模块"""
+    if os.path.exists(args.store):
+        import sqlite3
+
+        conn = sqlite3.connect(args.store)
+        documents = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        changes = dict(conn.execute("SELECT change_type, COUNT(*) FROM versions GROUP BY change_type").fetchall())
+        last_change = conn.execute("SELECT MAX(changed_at) FROM versions").fetchone()[0]
+        conn.close()
+        print(f"🗂️ 版本库 {args.store}: {documents} 篇政策，新增 {changes.get('new', 0)} 次，"
+              f"修改 {changes.get('modified', 0)} 次，最近变更 {last_change or '-'}")
+    else:
+        print(f"🗂️ 版本库 {args.store} 不存在")
+
+    manifest_file = os.path.join(args.index, 'manifest.json')
+    if os.path.exists(manifest_file):
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        months = sorted(p for p in manifest if p != 'unknown')
+        span = f"{months[0]} ~ {months[-1]}" if months else '-'
+        print(f"🗓️ 分区索引 {args.index}: {len(manifest)} 个分区，{sum(p['count'] for p in manifest.values())} 条记录，"
+              f"月份范围 {span}，日期未知 {manifest.get('unknown', {}).get('count', 0)} 条")
+    else:
+        print(f"🗓️ 分区索引 {args.index} 不存在")
+
+    if os.path.exists(args.state):
+        with open(args.state, 'r', encoding='utf-8') as f:
+            hosts = json.load(f).get('hosts', {})
+        scheduled = [entry['next_visit'] for entry in hosts.values() if entry.get('next_visit')]
+        next_visit = time.strftime('%Y-%m-%d %H:%M', time.localtime(min(scheduled))) if scheduled else '-'
+        print(f"📅 调度状态 {args.state}: {len(hosts)} 个网站，下次抓取 {next_visit}")
+
+    progress = latest_progress_file()
+    if progress:
+        print(f"💾 最近进度: {progress[0]}（已完成 {progress[1]} 个网站）")
+
+def cmd_bench(args):
+    """转交给对应的基准测试脚本，参数原样传递"""
+    import runpy
+
+    script = os.path.join(CRAWL_DIR, BENCH_SCRIPTS[args.target])
+    sys.argv = [script] + args.args
+    runpy.run_path(script, run_name='__main__')
+
+def main():
+    parser = argparse.ArgumentParser(description='政策爬虫与配套工具的统一命令行入口')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    crawl = subparsers.add_parser('crawl', help='爬取网站列表中的全部网站')
+    crawl.add_argument('--websites', help='网站列表文件，默认当前目录或脚本目录下的 websites.txt')
+    crawl.add_argument('--delay', type=float, default=1, help='请求间隔（秒）')
+    crawl.set_defaults(func=cmd_crawl)
+
+    resume = subparsers.add_parser('resume', help='从最近的进度文件继续爬取')
+    resume.add_argument('--websites', help='网站列表文件，需与中断前使用的一致')
+    resume.add_argument('--progress', help='指定进度文件，默认当前目录下序号最大的 progress_after_website_N.json')
+    resume.add_argument('--delay', type=float, default=1)
+    resume.set_defaults(func=cmd_resume)
+
+    export = subparsers.add_parser('export', help='把爬取结果转换为其他格式')
+    export.add_argument('source', help='爬取结果JSON或压缩语料库目录')
+    export.add_argument('--format', choices=['all', 'corpus', 'jsonl'], default='all',
+                        help='all 与爬取结束时相同（JSON/CSV/TXT/语料库/分区索引/预分词）')
+    export.add_argument('--out', help='输出路径（corpus/jsonl）')
+    export.set_defaults(func=cmd_export)
+
+    stats = subparsers.add_parser('stats', help='查看版本库、分区索引与调度状态')
+    stats.add_argument('--store', default='policy_versions.db')
+    stats.add_argument('--index', default='policy_index')
+    stats.add_argument('--state', default='scheduler_state.json')
+    stats.set_defaults(func=cmd_stats)
+
+    bench = subparsers.add_parser('bench', help='运行基准测试')
+    bench.add_argument('target', choices=sorted(BENCH_SCRIPTS))
+    bench.add_argument('args', nargs=argparse.REMAINDER, help='传给基准测试脚本的参数')
+    bench.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import json
+import os
+import sys
+import time
+
+# 压缩语料库目录内的文件名
+DICT_FILE = 'dictionary.bin'
+DATA_FILE = 'records.zst'
+INDEX_FILE = 'index.json'
+
+# 字典大小与压缩级别
+DICT_SIZE = 112 * 1024
+COMPRESSION_LEVEL = 19
+
+# 训练字典所需的最少样本数，样本太少时zstd无法训练
+MIN_DICT_SAMPLES = 16
+
+def import_zstd():
+    """按需导入zstandard，未安装时给出提示"""
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        raise ImportError("压缩语料库需要 zstandard，请先执行 pip install zstandard")
+
+def encode_record(policy):
+    """单条政策序列化为紧凑JSON字节"""
+    return json.dumps(policy, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def train_dictionary(samples, dict_size=DICT_SIZE):
+    """用政策文本训练zstd字典，样本不足或训练失败时返回None"""
+    zstd = import_zstd()
+    if len(samples) < MIN_DICT_SAMPLES:
+        return None
+    try:
+        return zstd.train_dictionary(dict_size, samples)
+    except zstd.ZstdError as e:
+        print(f"⚠️ 字典训练失败，改为无字典压缩: {e}")
+        return None
+
+def write_corpus(policy_data, out_dir, level=COMPRESSION_LEVEL, dictionary=None):
+    """写出压缩语料库：每条记录是独立的zstd帧，可按偏移随机读取"""
+    zstd = import_zstd()
+    os.makedirs(out_dir, exist_ok=True)
+    samples = [encode_record(p) for p in policy_data]
+
+    if dictionary is None:
+        dictionary = train_dictionary(samples)
+    if dictionary is not None:
+        with open(os.path.join(out_dir, DICT_FILE), 'wb') as f:
+            f.write(dictionary.as_bytes())
+        compressor = zstd.ZstdCompressor(level=level, dict_data=dictionary)
+    else:
+        compressor = zstd.ZstdCompressor(level=level)
+
+    records = []
+    offset = 0
+    with open(os.path.join(out_dir, DATA_FILE), 'wb') as f:
+        for policy, raw in zip(policy_data, samples):
+            frame = compressor.compress(raw)
+            f.write(frame)
+            records.append([offset, len(frame), policy.get('url', '')])
+            offset += len(frame)
+
+    index = {
+        'format': 1,
+        'dictionary': DICT_FILE if dictionary is not None else None,
+        'raw_bytes': sum(len(s) for s in samples),
+        'records': records
+    }
+    with open(os.path.join(out_dir, INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    return index
+
+class CorpusReader:
+    """压缩语料库读取器，支持顺序遍历、按序号和按URL随机读取"""
+
+    def __init__(self, corpus_dir):
+        zstd = import_zstd()
+        with open(os.path.join(corpus_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+        self.records = self.index['records']
+        self.url_positions = {url: i for i, (_, _, url) in enumerate(self.records)}
+
+        if self.index.get('dictionary'):
+            with open(os.path.join(corpus_dir, self.index['dictionary']), 'rb') as f:
+                dictionary = zstd.ZstdCompressionDict(f.read())
+            self.decompressor = zstd.ZstdDecompressor(dict_data=dictionary)
+        else:
+            self.decompressor = zstd.ZstdDecompressor()
+        self.data = open(os.path.join(corpus_dir, DATA_FILE), 'rb')
+
+    def __len__(self):
+        return len(self.records)
+
+    def read_frame(self, offset, length):
+        """按偏移读取一帧，不依赖文件的当前读写位置，遍历中穿插随机读取也互不干扰"""
+        if hasattr(os, 'pread'):
+            return os.pread(self.data.fileno(), length, offset)
+        # Windows没有pread，退回 seek+read
+        self.data.seek(offset)
+        return self.data.read(length)
+
+    def __getitem__(self, position):
+        offset, length, _ = self.records[position]
+        return json.loads(self.decompressor.decompress(self.read_frame(offset, length)))
+
+    def __iter__(self):
+        for offset, length, _ in self.records:
+            yield json.loads(self.decompressor.decompress(self.read_frame(offset, length)))
+
+    def get_by_url(self, url):
+        position = self.url_positions.get(url)
+        return None if position is None else self[position]
+
+    def close(self):
+        self.data.close()
+
+def load_policies(path):
+    """统一读取入口：JSON文件或压缩语料库目录，返回政策记录迭代器"""
+    if os.path.isdir(path):
+        reader = CorpusReader(path)
+        try:
+            yield from reader
+        finally:
+            reader.close()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+
+def bench_corpus(json_file, out_dir=None):
+    """对比原始JSON与压缩语料库的体积和解码吞吐量"""
+    zstd = import_zstd()
+    with open(json_file, 'r', encoding='utf-8') as f:
+        policy_data = json.load(f)
+    out_dir = out_dir or os.path.splitext(json_file)[0] + '_corpus'
+
+    start = time.perf_counter()
+    index = write_corpus(policy_data, out_dir)
+    build_time = time.perf_counter() - start
+
+    json_bytes = os.path.getsize(json_file)
+    compressed_bytes = os.path.getsize(os.path.join(out_dir, DATA_FILE))
+    dict_path = os.path.join(out_dir, DICT_FILE)
+    dict_bytes = os.path.getsize(dict_path) if index['dictionary'] else 0
+
+    # 对照：不带字典的逐条压缩
+    plain = zstd.ZstdCompressor(level=COMPRESSION_LEVEL)
+    plain_bytes = sum(len(plain.compress(encode_record(p))) for p in policy_data)
+
+    reader = CorpusReader(out_dir)
+    start = time.perf_counter()
+    count = sum(1 for _ in reader)
+    decode_time = time.perf_counter() - start or 1e-9
+
+    start = time.perf_counter()
+    for position in range(0, len(reader), max(1, len(reader) // 100)):
+        reader[position]
+    random_reads = len(range(0, len(reader), max(1, len(reader) // 100)))
+    random_time = time.perf_counter() - start
+    reader.close()
+
+    start = time.perf_counter()
+    with open(json_file, 'r', encoding='utf-8') as f:
+        json.load(f)
+    json_time = time.perf_counter() - start or 1e-9
+
+    print(f"📦 记录数: {count}，构建耗时 {build_time:.2f}s")
+    print(f"   原始JSON: {json_bytes / 1024:.1f} KB")
+    print(f"   字典压缩: {(compressed_bytes + dict_bytes) / 1024:.1f} KB（含字典 {dict_bytes / 1024:.1f} KB），"
+          f"压缩比 {json_bytes / (compressed_bytes + dict_bytes):.2f}x")
+    print(f"   无字典逐条压缩: {plain_bytes / 1024:.1f} KB，压缩比 {json_bytes / plain_bytes:.2f}x")
+    print(f"   顺序解码: {count / decode_time:.0f} 条/s，{index['raw_bytes'] / 1048576 / decode_time:.1f} MB/s"
+          f"（JSON整体加载 {json_bytes / 1048576 / json_time:.1f} MB/s）")
+    if random_reads:
+        print(f"   随机读取: 平均 {random_time / random_reads * 1000:.3f} ms/条")
+
+if __name__ == "__main__":
+    # 用法: python corpus_store.py policies_all_websites_xxx.json [输出目录]
+    if len(sys.argv) < 2:
+        print("用法: python corpus_store.py JSON文件 [输出目录]")
+        sys.exit(1)
+    bench_corpus(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
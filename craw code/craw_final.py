@@ -1,11 +1,47 @@
-import requests
-from bs4 import BeautifulSoup
-import json
 import time
 import re
-import csv
-from urllib.parse import urljoin
-import os
+from urllib.parse import urljoin, urlparse
+
+from attachments import find_attachment_links, create_extraction_pool, submit_attachments, merge_attachment_text
+from version_store import PolicyVersionStore, VERSION_DB
+from corpus_store import write_corpus
+from crawl_archive import replay_url
+from discovery import discover_policy_links, merge_list_links
+from policy_dates import normalize_publication_date
+from partition_index import add_policies
+from policy_tokenizer import tokenize_batch
+from crawl_metrics import stage_timer, observe_response, increment, log_event, dump_metrics, start_metrics_dumper
+
+# 每个主机探测到的页面编码缓存，避免同一网站反复探测
+host_encoding_cache = {}
+
+# 抓取统计：已下载但未产生可用文本的页面及其浪费的字节数
+fetch_stats = {
+    'pages_fetched': 0,
+    'bytes_fetched': 0,
+    'empty_pages': 0,
+    'wasted_bytes': 0,
+}
+
+# 常见编码别名统一映射，GBK/GB2312 统一按超集 GB18030 解码
+ENCODING_ALIASES = {
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'x-gbk': 'gb18030',
+    'gb_2312-80': 'gb18030',
+    'utf8': 'utf-8',
+}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+}
+
+# 政策标题关键词，用于筛选列表页链接和订阅源条目
+POLICY_KEYWORDS = ['通知', '公告', '指南', '办法', '规定', '意见', '方案', '政策', '解读']
+
+# 一次爬取最多收集的政策条数
+MAX_POLICIES = 1000
 
 def load_websites_from_file(filename="websites.txt"):
     """从文件加载网站列表"""
@@ -26,114 +62,413 @@ def load_websites_from_file(filename="websites.txt"):
         print(f"读取网站列表文件时出错: {e}")
         return []
 
-def crawl_multiple_websites():
-    """爬取多个网站的政策信息"""
+def normalize_encoding(name):
+    """标准化编码名称，无法识别时返回None"""
+    if not name:
+        return None
+    name = name.strip().strip('"\'').lower()
+    name = ENCODING_ALIASES.get(name, name)
+    try:
+        import codecs
+        codecs.lookup(name)
+    except LookupError:
+        return None
+    return name
+
+def sniff_header_encoding(content_type):
+    """从HTTP响应头Content-Type中提取显式声明的charset"""
+    if not content_type:
+        return None
+    match = re.search(r'charset\s*=\s*["\']?([\w\-]+)', content_type, re.I)
+    return normalize_encoding(match.group(1)) if match else None
+
+def sniff_meta_encoding(raw):
+    """在原始字节的前部查找<meta charset>声明"""
+    head = raw[:4096]
+    match = re.search(rb'<meta[^>]+charset\s*=\s*["\']?([\w\-]+)', head, re.I)
+    if match:
+        return normalize_encoding(match.group(1).decode('ascii', 'ignore'))
+    return None
+
+def guess_encoding_from_bytes(raw, fallback=None):
+    """根据字节统计推断编码：先严格尝试UTF-8与GB18030，都不成立时使用fallback，再交给charset_normalizer"""
+    for candidate in ('utf-8', 'gb18030'):
+        try:
+            raw.decode(candidate)
+            return candidate
+        except UnicodeDecodeError:
+            continue
+    if fallback:
+        return fallback
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(raw).best()
+        if best is not None:
+            return normalize_encoding(best.encoding) or 'utf-8'
+    except ImportError:
+        pass
+    return 'utf-8'
+
+def can_decode(raw, encoding):
+    """判断原始字节能否按指定编码无错解码"""
+    try:
+        raw.decode(encoding)
+        return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+def is_single_byte_encoding(encoding):
+    """单字节编码（ISO-8859-*、Windows-125x等）能无错解码任意字节，声明是否正确无从验证"""
+    import codecs
+    return codecs.lookup(encoding).name.startswith(('iso8859', 'latin', 'cp125', 'cp437', 'mac-'))
+
+def detect_page_encoding(raw, content_type=None, host=None):
+    """按 严格UTF-8 -> HTTP头 -> meta声明 -> 主机缓存 -> 字节统计 的顺序确定页面编码
+
+    GB18030几乎能无错解码任何字节序列，主机缓存只在页面本身没有可靠线索时才使用，
+    避免同一网站先遇到GBK页面后把之后的UTF-8页面也解码成乱码。
+    含非ASCII字节的页面声明为Latin-1等单字节编码时只作为弱证据，排在字节统计的严格尝试之后。
+    """
+    # 含非ASCII字节且能严格按UTF-8解码时，GBK文本几乎不可能满足，直接判定为UTF-8
+    if not raw.isascii() and can_decode(raw, 'utf-8'):
+        return 'utf-8'
+    
+    encoding = None
+    weak_candidate = None
+    for candidate in (sniff_header_encoding(content_type), sniff_meta_encoding(raw)):
+        # 声明的编码必须能正确解码，否则视为网站声明错误
+        if not candidate or not can_decode(raw, candidate):
+            continue
+        # 单字节编码总能解码成功，GBK网站误声明为ISO-8859-1时应继续参考meta声明与字节统计
+        if not raw.isascii() and is_single_byte_encoding(candidate):
+            weak_candidate = weak_candidate or candidate
+            continue
+        encoding = candidate
+        break
+    
+    if encoding is None:
+        cached = host_encoding_cache.get(host) if host else None
+        if cached and can_decode(raw, cached):
+            return cached
+        encoding = guess_encoding_from_bytes(raw, fallback=weak_candidate)
+    
+    if host:
+        host_encoding_cache[host] = encoding
+    return encoding
+
+def fetch_page(url, headers, timeout, method='GET', stream=False, **kwargs):
+    """下载页面并记录各主机的延迟、字节数与状态码
+
+    订阅源、robots.txt、检索接口与附件下载也经由这里发出请求，指标与抓取日志覆盖全部流量。
+    stream=True 时不读取响应体，调用方读完或放弃后调用 finish_fetch 记录。
+    """
+    import requests
+    
+    start = time.perf_counter()
+    response = requests.request(method, replay_url(url), headers=headers, timeout=timeout, stream=stream, **kwargs)
+    if stream:
+        response.fetch_started = start
+    else:
+        observe_response(response, time.perf_counter() - start)
+    return response
+
+def finish_fetch(response, size):
+    """记录流式响应的指标，size 为实际读取的响应体字节数"""
+    observe_response(response, time.perf_counter() - response.fetch_started, size)
+
+def decode_response(response):
+    """在解析前基于原始字节解码响应内容"""
+    raw = response.content
+    host = urlparse(response.url).netloc.lower()
+    with stage_timer('decode', host):
+        encoding = detect_page_encoding(raw, response.headers.get('Content-Type'), host)
+        text = raw.decode(encoding, errors='replace')
+    fetch_stats['pages_fetched'] += 1
+    fetch_stats['bytes_fetched'] += len(raw)
+    return text
+
+def parse_html(response):
+    """解码并解析页面"""
+    from bs4 import BeautifulSoup
+    
+    html = decode_response(response)
+    with stage_timer('parse', urlparse(response.url).netloc.lower()):
+        return BeautifulSoup(html, 'html.parser')
+
+def record_empty_page(response):
+    """记录已下载但未得到可用文本的页面"""
+    host = urlparse(response.url).netloc.lower()
+    fetch_stats['empty_pages'] += 1
+    fetch_stats['wasted_bytes'] += len(response.content)
+    increment('crawl_empty_pages_total', host=host)
+    increment('crawl_wasted_bytes_total', len(response.content), host=host)
+    log_event('empty_page', url=response.url, host=host, bytes=len(response.content))
+
+def is_usable_text(text):
+    """判断提取出的文本是否可用（非空且不是大面积乱码）"""
+    if not text or text == "无法提取内容":
+        return False
+    return text.count('\ufffd') / len(text) < 0.05
+
+def crawl_website(list_url, headers, version_store, extraction_pool, request_delay=1, limit=MAX_POLICIES):
+    """爬取单个网站：发现政策链接，逐个抓取详情页与附件，写入版本库
+
+    返回 (本站政策记录, 附件抽取进程池是否需要重建)，limit 为本站最多抓取的政策条数。
+    """
+    policy_data = []
+    attachment_jobs = []
+    list_host = urlparse(list_url).netloc.lower()
+    
+    # 先通过sitemap/RSS发现新增或更新的政策；订阅源可能不含本栏目的政策，列表页始终爬取
+    try:
+        with stage_timer('discovery', list_host):
+            discovered = discover_policy_links(list_url, headers, version_store, POLICY_KEYWORDS)
+    except Exception as e:
+        print(f"⚠️ 订阅源发现失败，改为爬取列表页: {e}")
+        discovered = None
+    if discovered is not None:
+        log_event('discovery', url=list_url, links=len(discovered))
+    
+    # 爬取列表页
+    try:
+        response = fetch_page(list_url, headers, timeout=15)
+        response.raise_for_status()
+    except Exception as e:
+        if discovered is None:
+            raise
+        print(f"⚠️ 列表页爬取失败，只抓取订阅源发现的政策: {e}")
+        response = None
+    
+    if response is not None:
+        soup = parse_html(response)
+        
+        # 提取政策链接 - 使用更通用的方法
+        with stage_timer('extract_links', list_host):
+            list_links = extract_policy_links(soup, list_url)
+        log_event('list_page', url=list_url, links=len(list_links))
+        print(f"从该网站找到 {len(list_links)} 个政策链接")
+        if not list_links and not is_usable_text(soup.get_text(strip=True)):
+            record_empty_page(response)
+    else:
+        list_links = []
+    
+    # 有订阅源时列表页只补充版本库中从未抓取过的链接，已抓取的由订阅源的lastmod判断是否更新
+    policy_links = list_links if discovered is None else merge_list_links(discovered, list_links, version_store)
+    if not policy_links:
+        print("✅ 没有新增或更新的政策，跳过该网站")
+        return policy_data, False
+    
+    # 第二级：逐个爬取政策详情内容
+    for i, policy in enumerate(policy_links):
+        if len(policy_data) >= limit:  # 达到本次爬取的条数上限，停止爬取
+            print(f"已达到{MAX_POLICIES}条数据目标，停止爬取")
+            break
+            
+        try:
+            print(f"正在爬取第 {i+1}/{len(policy_links)} 个政策: {(policy['title'] or policy['url'])[:50]}...")
+            
+            # 爬取详情页
+            detail_response = fetch_page(policy['url'], headers, timeout=20)
+            
+            detail_soup = parse_html(detail_response) if detail_response.status_code == 200 else None
+            
+            if detail_soup is None:
+                print(f"✗ 无法访问页面: {detail_response.status_code}")
+            
+            elif not policy['title'] and not is_policy_title(extract_page_title(detail_soup)):
+                # sitemap条目没有标题，与列表页链接一样按政策关键词过滤，排除机构简介等普通页面
+                print("⏭️ 页面标题不含政策关键词，跳过")
+                log_event('skip_page', url=policy['url'], reason='title')
+                version_store.mark_skipped(policy['url'])
+            
+            else:
+                # 提取政策内容
+                policy_info = build_policy_info(policy, detail_soup, detail_response, list_url)
+                content = policy_info['content']
+                
+                # 正文常以附件形式发布，下载后交给进程池抽取
+                attachments = find_attachment_links(detail_soup, policy['url'])
+                if attachments:
+                    print(f"📎 发现 {len(attachments)} 个附件")
+                    attachment_jobs.append((policy_info, submit_attachments(extraction_pool, policy_info, attachments, headers)))
+                
+                policy_data.append(policy_info)
+                print(f"✓ 成功爬取内容，长度: {len(content)} 字符，本站第 {len(policy_data)} 条")
+            
+            # 礼貌延迟，避免请求过快
+            time.sleep(request_delay)
+            
+        except Exception as e:
+            print(f"✗ 爬取单个政策失败: {e}")
+            increment('crawl_errors_total', stage='detail', host=list_host)
+            log_event('error', stage='detail', url=policy['url'], error=str(e))
+            continue
+    
+    # 合并附件抽取结果
+    with stage_timer('attachments', list_host):
+        pool_broken = False
+        for policy_info, pending in attachment_jobs:
+            pool_broken = merge_attachment_text(policy_info, pending) or pool_broken
+        if pool_broken:
+            increment('crawl_errors_total', stage='attachments', host=list_host)
+    
+    # 写入版本库，仅内容变化时产生新版本
+    with stage_timer('write', list_host):
+        for policy_info in policy_data:
+            change_type, version = version_store.upsert(policy_info)
+            policy_info['version'] = version
+            policy_info['change_type'] = change_type
+    
+    return policy_data, pool_broken
+
+def crawl_multiple_websites(websites_file="websites.txt", request_delay=1, websites=None, resume_data=None, start_index=1):
+    """爬取多个网站的政策信息，返回本次爬取到的政策记录
+
+    resume_data 与 start_index 用于断点续爬：在已保存的进度数据基础上，从第 start_index 个网站继续。
+    """
     
     # 加载网站列表
-    websites = load_websites_from_file()
+    if websites is None:
+        websites = load_websites_from_file(websites_file)
     if not websites:
         print("没有找到可用的网站列表，程序退出")
-        return
+        return []
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-    }
+    headers = DEFAULT_HEADERS
+    
+    all_policy_data = list(resume_data or [])
+    total_policies_crawled = len(all_policy_data)
+    
+    # 附件文本抽取进程池，与抓取过程并行
+    extraction_pool = create_extraction_pool()
+    
+    # 版本库：按规范URL与内容哈希记录政策的历次变更
+    version_store = PolicyVersionStore()
+    change_counts = {'new': 0, 'modified': 0, 'unchanged': 0}
     
-    all_policy_data = []
-    total_policies_crawled = 0
+    # 定期导出指标文件，爬取过程中可随时查看 crawl_metrics.prom
+    start_metrics_dumper()
+    log_event('crawl_start', websites=len(websites), start_index=start_index)
     
     # 遍历每个网站
-    for website_index, list_url in enumerate(websites, 1):
+    for website_index, list_url in enumerate(websites[start_index - 1:], start_index):
         print(f"\n{'='*60}")
         print(f"开始爬取第 {website_index}/{len(websites)} 个网站: {list_url}")
         print(f"{'='*60}")
         
-        policy_data = []
-        
         try:
-            # 爬取列表页
-            response = requests.get(list_url, headers=headers, timeout=15)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 提取政策链接 - 使用更通用的方法
-            policy_links = extract_policy_links(soup, list_url)
-            print(f"从该网站找到 {len(policy_links)} 个政策链接")
-            
-            if not policy_links:
-                print("⚠️ 未找到政策链接，跳过该网站")
+            list_host = urlparse(list_url).netloc.lower()
+            policy_data, pool_broken = crawl_website(list_url, headers, version_store, extraction_pool,
+                                                     request_delay, MAX_POLICIES - total_policies_crawled)
+            if pool_broken:
+                # 工作进程崩溃或卡死后进程池无法继续使用，为后续网站重建
+                print("⚠️ 附件抽取进程池异常，已重建")
+                extraction_pool.shutdown(wait=False, cancel_futures=True)
+                extraction_pool = create_extraction_pool()
+            if not policy_data:
                 continue
             
-            # 第二级：逐个爬取政策详情内容
-            for i, policy in enumerate(policy_links):
-                if total_policies_crawled >= 1000:  # 如果已经达到1000条，停止爬取
-                    print("已达到1000条数据目标，停止爬取")
-                    break
-                    
-                try:
-                    print(f"正在爬取第 {i+1}/{len(policy_links)} 个政策: {policy['title'][:50]}...")
-                    
-                    # 爬取详情页
-                    detail_response = requests.get(policy['url'], headers=headers, timeout=20)
-                    detail_response.encoding = 'utf-8'
-                    
-                    if detail_response.status_code == 200:
-                        detail_soup = BeautifulSoup(detail_response.text, 'html.parser')
-                        
-                        # 提取政策内容
-                        content = extract_policy_content(detail_soup)
-                        pub_date = extract_publication_date(detail_soup)
-                        source = extract_source(detail_soup, list_url)  # 根据URL判断来源
-                        
-                        policy_info = {
-                            'title': policy['title'],
-                            'url': policy['url'],
-                            'publication_date': pub_date,
-                            'source': source,
-                            'website': list_url,  # 记录来源网站
-                            'content': content,
-                            'content_length': len(content),
-                            'crawl_time': time.strftime('%Y-%m-%d %H:%M:%S')
-                        }
-                        
-                        policy_data.append(policy_info)
-                        total_policies_crawled += 1
-                        print(f"✓ 成功爬取内容，长度: {len(content)} 字符，累计: {total_policies_crawled} 条")
-                        
-                    else:
-                        print(f"✗ 无法访问页面: {detail_response.status_code}")
-                    
-                    # 礼貌延迟，避免请求过快
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    print(f"✗ 爬取单个政策失败: {e}")
-                    continue
+            for policy_info in policy_data:
+                change_counts[policy_info['change_type']] += 1
+            total_policies_crawled += len(policy_data)
             
             # 将该网站的政策数据添加到总数据中
             all_policy_data.extend(policy_data)
-            print(f"✅ 完成该网站爬取，获得 {len(policy_data)} 条政策")
+            print(f"✅ 完成该网站爬取，获得 {len(policy_data)} 条政策，累计: {total_policies_crawled} 条")
+            log_event('website_done', url=list_url, policies=len(policy_data))
             
             # 保存当前进度（每个网站爬取后都保存一次）
-            save_progress(all_policy_data, website_index)
+            with stage_timer('write', list_host):
+                save_progress(all_policy_data, website_index)
             
-            if total_policies_crawled >= 1000:
-                print("🎯 已达到1000条数据目标！")
+            if total_policies_crawled >= MAX_POLICIES:
+                print(f"🎯 已达到{MAX_POLICIES}条数据目标！")
                 break
                 
         except Exception as e:
             print(f"❌ 爬取网站 {list_url} 时出错: {e}")
+            increment('crawl_errors_total', stage='website', host=urlparse(list_url).netloc.lower())
+            log_event('error', stage='website', url=list_url, error=str(e))
             continue
     
+    extraction_pool.shutdown()
+    version_store.close()
+    print(f"🗂️ 版本库: 新增 {change_counts['new']} 条，修改 {change_counts['modified']} 条，未变化 {change_counts['unchanged']} 条")
+    
     # 最终保存所有数据
     if all_policy_data:
-        save_final_data(all_policy_data)
+        with stage_timer('write'):
+            save_final_data(all_policy_data)
         print(f"\n🎉 爬取完成！总共爬取了 {len(all_policy_data)} 条政策信息")
     else:
         print("未找到任何政策内容")
+    
+    print_fetch_stats()
+    log_event('crawl_done', policies=len(all_policy_data), **fetch_stats)
+    dump_metrics()
+    return all_policy_data
+
+def recrawl_website(list_url, request_delay=1, store_path=VERSION_DB):
+    """供定时调度使用的单站增量抓取：只更新版本库与月份分区索引，不生成进度文件和整批导出文件"""
+    version_store = PolicyVersionStore(store_path)
+    extraction_pool = create_extraction_pool()
+    start_metrics_dumper()
+    pool_broken = True
+    try:
+        policy_data, pool_broken = crawl_website(list_url, DEFAULT_HEADERS, version_store, extraction_pool, request_delay)
+    finally:
+        # 进程池异常时不等待卡死的工作进程
+        extraction_pool.shutdown(wait=not pool_broken, cancel_futures=pool_broken)
+        version_store.close()
+    
+    # 只有新增或修改的政策需要更新索引
+    changed = [p for p in policy_data if p['change_type'] != 'unchanged']
+    if changed:
+        with stage_timer('write', urlparse(list_url).netloc.lower()):
+            add_policies(changed)
+    log_event('website_done', url=list_url, policies=len(policy_data), changed=len(changed))
+    dump_metrics()
+    return policy_data
+
+def build_policy_info(policy, detail_soup, detail_response, list_url):
+    """从详情页抽取正文、日期与来源，组装一条政策记录"""
+    with stage_timer('extract', urlparse(list_url).netloc.lower()):
+        content = extract_policy_content(detail_soup)
+        pub_date, date_confidence = extract_publication_date(detail_soup, policy['url'])
+        source = extract_source(detail_soup, list_url)  # 根据URL判断来源
+    if not is_usable_text(content):
+        record_empty_page(detail_response)
+        print("⚠️ 页面已下载但未提取到可用文本")
+    
+    return {
+        'title': policy['title'] or extract_page_title(detail_soup),
+        'url': policy['url'],
+        'publication_date': pub_date,
+        'date_confidence': date_confidence,
+        'source': source,
+        'website': list_url,  # 记录来源网站
+        'content': content,
+        'content_length': len(content),
+        'crawl_time': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+def is_policy_title(title):
+    """标题足够长且包含政策关键词才视为政策文件"""
+    return len(title) > 5 and any(keyword in title for keyword in POLICY_KEYWORDS)
+
+def extract_page_title(soup):
+    """订阅源条目没有标题时，从详情页的h1或<title>中补全"""
+    for tag in (soup.find('h1'), soup.title):
+        if tag and tag.get_text(strip=True):
+            return tag.get_text(strip=True)
+    return "无标题"
+
+def print_fetch_stats():
+    """输出抓取统计，显示无效下载浪费的流量"""
+    print(f"📈 共下载 {fetch_stats['pages_fetched']} 个页面，{fetch_stats['bytes_fetched'] / 1024:.1f} KB")
+    print(f"   无可用文本的页面: {fetch_stats['empty_pages']} 个，浪费 {fetch_stats['wasted_bytes'] / 1024:.1f} KB")
+    if host_encoding_cache:
+        print(f"   各网站编码: {host_encoding_cache}")
 
 def extract_policy_links(soup, base_url):
     """提取政策链接，支持多种网站结构"""
@@ -156,9 +491,7 @@ def extract_policy_links(soup, base_url):
                 href = link.get('href', '')
                 title = link.get_text().strip()
                 
-                if (href and title and 
-                    len(title) > 5 and 
-                    any(keyword in title for keyword in ['通知', '公告', '指南', '办法', '规定', '意见', '方案', '政策', '解读'])):
+                if href and is_policy_title(title):
                     
                     # 补全链接
                     full_url = urljoin(base_url, href)
@@ -327,6 +660,8 @@ def clean_source_name(source_name):
 
 def save_progress(policy_data, website_index):
     """保存爬取进度"""
+    import json
+    
     if policy_data:
         # 保存进度文件
         progress_file = f'progress_after_website_{website_index}.json'
@@ -336,6 +671,9 @@ def save_progress(policy_data, website_index):
 
 def save_final_data(policy_data):
     """保存最终数据"""
+    import csv
+    import json
+    
     timestamp = time.strftime("%Y%m%d_%H%M%S")
     
     # 保存为JSON
@@ -371,12 +709,32 @@ def save_final_data(policy_data):
             f.write(f"【内容】\n{policy['content']}\n")
             f.write("="*100 + "\n\n")
     
+    # 保存为zstd字典压缩语料库，供后续处理按条随机读取
+    corpus_dir = f'policies_corpus_{timestamp}'
+    try:
+        write_corpus(policy_data, corpus_dir)
+    except ImportError as e:
+        print(f"⚠️ 跳过压缩语料库: {e}")
+        corpus_dir = None
+    
+    # 更新按月分区的索引，时间范围查询只需读取相关月份
+    add_policies(policy_data, corpus_dir=corpus_dir)
+    
+    # 预先分词并写入缓存，后续抽取、检索与去重直接读取词序列
+    try:
+        tokenize_batch([policy['content'] for policy in policy_data])
+    except ImportError as e:
+        print(f"⚠️ 跳过预分词: {e}")
+    
     print(f"📊 最终数据文件:")
     print(f"   JSON: {json_file}")
     print(f"   CSV: {csv_file}")
     print(f"   TXT: {txt_file}")
+    if corpus_dir:
+        print(f"   压缩语料库: {corpus_dir}")
+    print(f"   月份分区索引: policy_index/")
 
-# 原有的 extract_policy_content, extract_publication_date 函数保持不变
+# 详情页正文与发布日期抽取；日期的各种写法与置信度由 policy_dates.py 处理
 def extract_policy_content(soup):
     """提取政策正文内容"""
     content_selectors = [
@@ -407,22 +765,12 @@ def extract_policy_content(soup):
     
     return "无法提取内容"
 
-def extract_publication_date(soup):
-    """提取发布日期"""
-    date_patterns = [
-        r'发布时间[:：]\s*(\d{4}-\d{2}-\d{2})',
-        r'发布日期[:：]\s*(\d{4}-\d{2}-\d{2})',
-        r'时间[:：]\s*(\d{4}-\d{2}-\d{2})',
-        r'发表时间[:：]\s*(\d{4}-\d{2}-\d{2})'
-    ]
-    
-    text = soup.get_text()
-    for pattern in date_patterns:
-        match = re.search(pattern, text)
-        if match:
-            return match.group(1)
-    
-    return "未知日期"
+def extract_publication_date(soup, url=None):
+    """提取发布日期，返回 (YYYY-MM-DD 或 "未知日期", 置信度)"""
+    pub_date, confidence, _ = normalize_publication_date(soup.get_text(), url)
+    return pub_date or "未知日期", confidence
 
 if __name__ == "__main__":
-    crawl_multiple_websites()
+    from cli import default_websites_file
+
+    crawl_multiple_websites(default_websites_file())
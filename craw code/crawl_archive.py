@@ -0,0 +1,181 @@
+import gzip
+import os
+import sys
+import time
+import uuid
+from urllib.parse import urljoin, urlsplit
+
+# 回放模式环境变量：设置后所有请求降级为http，经 HTTP_PROXY 指向的回放服务器返回快照
+REPLAY_ENV = 'CRAWL_REPLAY'
+
+# 回放时保留的响应头，其余头（如压缩、分块）在录制时已由requests处理掉
+KEPT_HEADERS = ('content-type', 'last-modified', 'etag')
+
+def replay_url(url):
+    """回放模式下把https地址改写为http，使请求能经由本地回放代理"""
+    if os.environ.get(REPLAY_ENV) and url.startswith('https://'):
+        return 'http://' + url[len('https://'):]
+    return url
+
+def archive_key(url):
+    """快照索引键：忽略协议与锚点，只保留主机、路径和查询参数"""
+    parts = urlsplit(url)
+    key = parts.netloc.lower() + (parts.path or '/')
+    if parts.query:
+        key += '?' + parts.query
+    return key
+
+def write_record(f, url, status, headers, body):
+    """按WARC/1.0 response记录格式写入一个页面快照"""
+    header_lines = [f'HTTP/1.1 {status} {"OK" if status == 200 else "Recorded"}']
+    for name, value in headers.items():
+        if name.lower() in KEPT_HEADERS:
+            header_lines.append(f'{name}: {value}')
+    block = ('\r\n'.join(header_lines) + '\r\n\r\n').encode('utf-8') + body
+
+    warc_headers = [
+        'WARC/1.0',
+        'WARC-Type: response',
+        f'WARC-Target-URI: {url}',
+        f'WARC-Date: {time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}',
+        f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>',
+        'Content-Type: application/http; msgtype=response',
+        f'Content-Length: {len(block)}',
+    ]
+    f.write(('\r\n'.join(warc_headers) + '\r\n\r\n').encode('utf-8'))
+    f.write(block)
+    f.write(b'\r\n\r\n')
+
+def read_archive(path):
+    """读取快照归档，返回 {索引键: (状态码, 响应头, 正文)}"""
+    snapshots = {}
+    with gzip.open(path, 'rb') as f:
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            if not line.startswith(b'WARC/'):
+                continue
+            warc_headers = {}
+            while True:
+                line = f.readline().rstrip(b'\r\n')
+                if not line:
+                    break
+                name, _, value = line.decode('utf-8').partition(':')
+                warc_headers[name.strip().lower()] = value.strip()
+            block = f.read(int(warc_headers['content-length']))
+            f.read(4)
+
+            head, _, body = block.partition(b'\r\n\r\n')
+            head_lines = head.decode('utf-8').split('\r\n')
+            status = int(head_lines[0].split()[1])
+            headers = {}
+            for header_line in head_lines[1:]:
+                name, _, value = header_line.partition(':')
+                headers[name.strip()] = value.strip()
+            snapshots[archive_key(warc_headers['warc-target-uri'])] = (status, headers, body)
+    return snapshots
+
+def record_feed(f, url, headers, depth=0):
+    """录制一个订阅源文件，sitemap索引中的子sitemap按爬虫相同的层数一并录制，返回录制数量"""
+    import io
+    from xml.etree.ElementTree import ParseError
+
+    from craw_final import fetch_page
+    from discovery import MAX_SITEMAP_DEPTH, parse_feed
+
+    response = fetch_page(url, headers, timeout=20)
+    if response.status_code != 200:
+        return 0
+    write_record(f, url, 200, response.headers, response.content)
+    recorded = 1
+
+    body = response.content
+    if urlsplit(url).path.endswith('.gz'):
+        body = gzip.decompress(body)
+    nested = []
+    try:
+        for _ in parse_feed(io.BytesIO(body), url, nested):
+            pass
+    except ParseError:
+        return recorded
+    if depth < MAX_SITEMAP_DEPTH:
+        for child in nested:
+            recorded += record_feed(f, child, headers, depth + 1)
+    return recorded
+
+def record_page(f, url, headers, max_bytes=None):
+    """录制单个页面，返回响应；超过大小上限的附件不写入"""
+    from craw_final import fetch_page
+
+    response = fetch_page(url, headers, timeout=30)
+    if max_bytes is None or len(response.content) <= max_bytes:
+        write_record(f, url, response.status_code, response.headers, response.content)
+    return response
+
+def record_websites(websites, archive_path, details_per_site=20, request_delay=1):
+    """按爬虫的实际访问路径录制各网站：robots.txt、订阅源（含子sitemap）、列表页、详情页及附件
+
+    详情页与爬虫一样取自订阅源发现的结果，再补上列表页中订阅源未列出的链接。
+    """
+    from craw_final import DEFAULT_HEADERS, POLICY_KEYWORDS, parse_html, extract_policy_links
+    from attachments import MAX_ATTACHMENT_BYTES, find_attachment_links
+    from discovery import SEARCH_ENDPOINTS, find_feed_urls, discover_policy_links, merge_list_links
+    from version_store import PolicyVersionStore
+
+    recorded = 0
+    # 空的内存版本库：录制时订阅源中的条目全部视为新增，与首次爬取一致
+    version_store = PolicyVersionStore(':memory:')
+    with gzip.open(archive_path, 'wb') as f:
+        for website_index, list_url in enumerate(websites, 1):
+            print(f"📼 录制第 {website_index}/{len(websites)} 个网站: {list_url}")
+            host = urlsplit(list_url).netloc.lower()
+            try:
+                robots_url = urljoin(list_url, '/robots.txt')
+                record_page(f, robots_url, DEFAULT_HEADERS)
+                recorded += 1
+                feeds = find_feed_urls(list_url, DEFAULT_HEADERS)
+                for feed_url in feeds:
+                    recorded += record_feed(f, feed_url, DEFAULT_HEADERS)
+                if host in SEARCH_ENDPOINTS:
+                    record_page(f, SEARCH_ENDPOINTS[host]['url'], DEFAULT_HEADERS)
+                    recorded += 1
+
+                response = record_page(f, list_url, DEFAULT_HEADERS)
+                recorded += 1
+
+                discovered = None
+                if feeds or host in SEARCH_ENDPOINTS:
+                    discovered = discover_policy_links(list_url, DEFAULT_HEADERS, version_store, POLICY_KEYWORDS)
+                list_links = extract_policy_links(parse_html(response), list_url) if response.status_code == 200 else []
+                if discovered is None:
+                    policy_links = list_links
+                else:
+                    policy_links = merge_list_links(discovered, list_links, version_store)
+            except Exception as e:
+                print(f"✗ 录制列表页失败: {e}")
+                continue
+
+            for policy in policy_links[:details_per_site]:
+                try:
+                    detail_response = record_page(f, policy['url'], DEFAULT_HEADERS)
+                    recorded += 1
+                    if detail_response.status_code == 200:
+                        for attachment in find_attachment_links(parse_html(detail_response), policy['url']):
+                            record_page(f, attachment['url'], DEFAULT_HEADERS, MAX_ATTACHMENT_BYTES)
+                            recorded += 1
+                except Exception as e:
+                    print(f"✗ 录制详情页失败: {e}")
+                time.sleep(request_delay)
+    version_store.close()
+    print(f"💾 共录制 {recorded} 个页面到 {archive_path}")
+
+if __name__ == "__main__":
+    # 用法: python crawl_archive.py [网站列表文件] [归档文件] [每站详情页数]
+    from craw_final import load_websites_from_file
+
+    websites_file = sys.argv[1] if len(sys.argv) > 1 else 'websites.txt'
+    archive_path = sys.argv[2] if len(sys.argv) > 2 else 'fixtures/crawl_snapshot.warc.gz'
+    details_per_site = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+    record_websites(load_websites_from_file(websites_file), archive_path, details_per_site)
@@ -0,0 +1,162 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# 直方图分桶上界：耗时单位为秒，字节数单位为字节
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+BYTES_BUCKETS = (1024, 10240, 51200, 102400, 512000, 1048576, 5242880)
+
+# 结构化日志与指标文件
+LOG_FILE = 'crawl_log.jsonl'
+METRICS_FILE = 'crawl_metrics.prom'
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_log_fd = None
+_dumper_thread = None
+
+class Histogram:
+    """固定分桶直方图，记录次数、总和与各桶累计计数"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """向带标签的直方图中记录一次观测值"""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+def increment(name, amount=1, **labels):
+    """累加带标签的计数器"""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+@contextmanager
+def stage_timer(stage, host=None):
+    """统计一个爬取阶段（下载、解析、抽取、写盘等）的耗时"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        labels = {'stage': stage}
+        if host:
+            labels['host'] = host
+        observe('crawl_stage_seconds', time.perf_counter() - start, **labels)
+
+def observe_response(response, total_seconds, size=None):
+    """记录一次HTTP响应：按主机统计延迟、字节数与状态码
+
+    requests 的 elapsed 为发出请求到收到响应头的时间（首字节时间，包含DNS、建连与服务器处理，
+    无法单独区分建连耗时），总耗时减去它即为响应体下载时间。流式响应由调用方传入实际读取的字节数。
+    """
+    host = urlparse(response.url).netloc.lower()
+    ttfb_seconds = response.elapsed.total_seconds()
+    if size is None:
+        size = len(response.content)
+    observe('crawl_stage_seconds', ttfb_seconds, stage='ttfb', host=host)
+    observe('crawl_stage_seconds', max(total_seconds - ttfb_seconds, 0.0), stage='download', host=host)
+    observe('crawl_host_latency_seconds', total_seconds, host=host)
+    observe('crawl_host_response_bytes', size, buckets=BYTES_BUCKETS, host=host)
+    increment('crawl_host_responses_total', host=host, status=str(response.status_code))
+    log_event('fetch', url=response.url, host=host, status=response.status_code,
+              bytes=size, ttfb=round(ttfb_seconds, 4), total=round(total_seconds, 4))
+
+def log_event(event, **fields):
+    """以JSON行格式写入结构化日志
+
+    每条记录用一次 write 追加完整的一行（O_APPEND），分布式本地模式下多个进程写同一文件时行不会交错。
+    """
+    global _log_fd
+    record = {'ts': round(time.time(), 3), 'event': event}
+    record.update(fields)
+    line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+    with _lock:
+        if _log_fd is None:
+            _log_fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        os.write(_log_fd, line)
+
+def _escape_label(value):
+    """按Prometheus文本格式转义标签值中的反斜杠、双引号与换行"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + '}'
+
+def render_prometheus():
+    """按Prometheus文本格式导出当前全部指标"""
+    lines = []
+    with _lock:
+        for (name, labels), value in sorted(_counters.items()):
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+        for (name, labels), histogram in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {histogram.count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {histogram.total:.6f}')
+            lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+def dump_metrics(path=METRICS_FILE):
+    """将指标写入文件，先写临时文件再替换，读取方不会读到半截内容"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+def start_metrics_dumper(interval=10, path=METRICS_FILE):
+    """后台线程定期导出指标文件，爬取过程中即可查看；同一进程内只启动一次，重复调用返回已有线程"""
+    global _dumper_thread
+
+    def run():
+        while True:
+            time.sleep(interval)
+            dump_metrics(path)
+
+    with _lock:
+        if _dumper_thread is None:
+            _dumper_thread = threading.Thread(target=run, name='metrics-dumper', daemon=True)
+            _dumper_thread.start()
+    return _dumper_thread
+
+def start_metrics_server(port=9108):
+    """启动 /metrics HTTP端点，供Prometheus抓取"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,276 @@
+import bisect
+import hashlib
+import json
+import sqlite3
+import time
+
+from version_store import canonicalize_url
+
+# 一致性哈希环上每个工作节点的虚拟节点数
+RING_REPLICAS = 64
+
+class HashRing:
+    """一致性哈希环：把网站主机映射到工作节点，节点增减时只迁移少量主机"""
+
+    def __init__(self, workers, replicas=RING_REPLICAS):
+        self.ring = []
+        for worker in workers:
+            for i in range(replicas):
+                self.ring.append((self._hash(f'{worker}#{i}'), worker))
+        self.ring.sort()
+        self.keys = [key for key, _ in self.ring]
+
+    @staticmethod
+    def _hash(value):
+        return int(hashlib.md5(value.encode('utf-8')).hexdigest()[:16], 16)
+
+    def node_for(self, host):
+        if not self.ring:
+            return None
+        position = bisect.bisect(self.keys, self._hash(host)) % len(self.ring)
+        return self.ring[position][1]
+
+    def hosts_for(self, worker, hosts):
+        return [host for host in hosts if self.node_for(host) == worker]
+
+class SQLiteQueue:
+    """基于SQLite文件的共享待爬队列与去重集合，适合单机多进程"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS hosts (host TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                host TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                claimed_by TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_status_host ON tasks(status, host);
+            CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS results (url TEXT PRIMARY KEY, payload TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS last_seen (url TEXT PRIMARY KEY, seen_at TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS skipped (url TEXT PRIMARY KEY, seen_at TEXT NOT NULL);
+        ''')
+
+    def reset(self):
+        """清空上一轮的队列、去重集合、抓取记录与结果"""
+        self.conn.executescript('''
+            DELETE FROM hosts; DELETE FROM seen; DELETE FROM tasks;
+            DELETE FROM workers; DELETE FROM results; DELETE FROM meta;
+            DELETE FROM last_seen; DELETE FROM skipped;
+        ''')
+
+    def add_hosts(self, hosts):
+        self.conn.executemany('INSERT OR IGNORE INTO hosts VALUES (?)', [(h,) for h in hosts])
+
+    def hosts(self):
+        return [row[0] for row in self.conn.execute('SELECT host FROM hosts ORDER BY host')]
+
+    def push(self, task):
+        """加入待爬任务，URL已见过时返回False"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            cursor = self.conn.execute('INSERT OR IGNORE INTO seen VALUES (?)', (canonicalize_url(task['url']),))
+            if cursor.rowcount:
+                self.conn.execute('INSERT INTO tasks (host, payload) VALUES (?, ?)',
+                                  (task['host'], json.dumps(task, ensure_ascii=False)))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return bool(cursor.rowcount)
+
+    def load_last_seen(self, pages):
+        """载入协调节点版本库中各页面的最近抓取时间 {规范URL: 时间}"""
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO last_seen VALUES (?, ?)', pages.items())
+
+    def last_seen(self, url):
+        """与 PolicyVersionStore.last_seen 相同，供各节点的订阅源发现判断条目是否新增或更新"""
+        row = self.conn.execute('SELECT seen_at FROM last_seen WHERE url = ?', (canonicalize_url(url),)).fetchone()
+        return row[0] if row else None
+
+    def mark_skipped(self, url, seen_at=None):
+        """记录本轮判定为非政策的页面，结束后由协调节点写回版本库"""
+        seen_at = seen_at or time.strftime('%Y-%m-%d %H:%M:%S')
+        url = canonicalize_url(url)
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO last_seen VALUES (?, ?)', (url, seen_at))
+            self.conn.execute('INSERT OR REPLACE INTO skipped VALUES (?, ?)', (url, seen_at))
+
+    def skipped_pages(self):
+        return dict(self.conn.execute('SELECT url, seen_at FROM skipped'))
+
+    def claim(self, worker_id, hosts):
+        """领取一个属于指定主机的待爬任务"""
+        if not hosts:
+            return None
+        placeholders = ','.join('?' * len(hosts))
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = self.conn.execute(
+                f"SELECT id, payload FROM tasks WHERE status = 'pending' AND host IN ({placeholders}) ORDER BY id LIMIT 1",
+                hosts
+            ).fetchone()
+            if row:
+                self.conn.execute("UPDATE tasks SET status = 'claimed', claimed_by = ? WHERE id = ?", (worker_id, row[0]))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        if row is None:
+            return None
+        task = json.loads(row[1])
+        task['_ref'] = row[0]
+        return task
+
+    def complete(self, task):
+        self.conn.execute('DELETE FROM tasks WHERE id = ?', (task['_ref'],))
+
+    def heartbeat(self, worker_id):
+        self.conn.execute('INSERT OR REPLACE INTO workers VALUES (?, ?)', (worker_id, time.time()))
+
+    def workers(self):
+        return dict(self.conn.execute('SELECT worker_id, heartbeat FROM workers'))
+
+    def remove_worker(self, worker_id):
+        """移除失联节点，并把它已领取未完成的任务放回队列"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.execute('DELETE FROM workers WHERE worker_id = ?', (worker_id,))
+        cursor = self.conn.execute(
+            "UPDATE tasks SET status = 'pending', claimed_by = NULL WHERE status = 'claimed' AND claimed_by = ?",
+            (worker_id,)
+        )
+        self.conn.execute('COMMIT')
+        return cursor.rowcount
+
+    def counts(self):
+        """返回 (待领取任务数, 进行中任务数)"""
+        rows = dict(self.conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status'))
+        return rows.get('pending', 0), rows.get('claimed', 0)
+
+    def save_result(self, policy):
+        self.conn.execute('INSERT OR REPLACE INTO results VALUES (?, ?)',
+                          (policy['url'], json.dumps(policy, ensure_ascii=False)))
+
+    def results(self):
+        return [json.loads(row[0]) for row in self.conn.execute('SELECT payload FROM results')]
+
+    def set_done(self, done=True):
+        self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', ('done', '1' if done else '0'))
+
+    def is_done(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'done'").fetchone()
+        return bool(row and row[0] == '1')
+
+    def close(self):
+        self.conn.close()
+
+class RedisQueue:
+    """基于Redis（或兼容服务）的共享队列，用于多机部署"""
+
+    def __init__(self, url, prefix='crawl'):
+        import redis
+
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix,) + parts)
+
+    def reset(self):
+        for key in self.redis.scan_iter(self._key('*')):
+            self.redis.delete(key)
+
+    def add_hosts(self, hosts):
+        if hosts:
+            self.redis.sadd(self._key('hosts'), *hosts)
+
+    def hosts(self):
+        return sorted(self.redis.smembers(self._key('hosts')))
+
+    def push(self, task):
+        if not self.redis.sadd(self._key('seen'), canonicalize_url(task['url'])):
+            return False
+        self.redis.rpush(self._key('frontier', task['host']), json.dumps(task, ensure_ascii=False))
+        return True
+
+    def load_last_seen(self, pages, batch=1000):
+        items = list(pages.items())
+        for start in range(0, len(items), batch):
+            self.redis.hset(self._key('last_seen'), mapping=dict(items[start:start + batch]))
+
+    def last_seen(self, url):
+        return self.redis.hget(self._key('last_seen'), canonicalize_url(url))
+
+    def mark_skipped(self, url, seen_at=None):
+        seen_at = seen_at or time.strftime('%Y-%m-%d %H:%M:%S')
+        url = canonicalize_url(url)
+        self.redis.hset(self._key('last_seen'), url, seen_at)
+        self.redis.hset(self._key('skipped'), url, seen_at)
+
+    def skipped_pages(self):
+        return self.redis.hgetall(self._key('skipped'))
+
+    def claim(self, worker_id, hosts):
+        # LMOVE 原子地把任务移入该节点的进行中列表，节点失联时可整体放回
+        for host in hosts:
+            raw = self.redis.lmove(self._key('frontier', host), self._key('inflight', worker_id), 'LEFT', 'RIGHT')
+            if raw:
+                task = json.loads(raw)
+                task['_ref'] = (worker_id, raw)
+                return task
+        return None
+
+    def complete(self, task):
+        worker_id, raw = task['_ref']
+        self.redis.lrem(self._key('inflight', worker_id), 1, raw)
+
+    def heartbeat(self, worker_id):
+        self.redis.hset(self._key('workers'), worker_id, time.time())
+
+    def workers(self):
+        return {k: float(v) for k, v in self.redis.hgetall(self._key('workers')).items()}
+
+    def remove_worker(self, worker_id):
+        self.redis.hdel(self._key('workers'), worker_id)
+        requeued = 0
+        while True:
+            raw = self.redis.lpop(self._key('inflight', worker_id))
+            if raw is None:
+                return requeued
+            self.redis.lpush(self._key('frontier', json.loads(raw)['host']), raw)
+            requeued += 1
+
+    def counts(self):
+        pending = sum(self.redis.llen(self._key('frontier', h)) for h in self.hosts())
+        claimed = sum(self.redis.llen(self._key('inflight', w)) for w in self.workers())
+        return pending, claimed
+
+    def save_result(self, policy):
+        self.redis.hset(self._key('results'), policy['url'], json.dumps(policy, ensure_ascii=False))
+
+    def results(self):
+        return [json.loads(v) for v in self.redis.hvals(self._key('results'))]
+
+    def set_done(self, done=True):
+        self.redis.set(self._key('done'), '1' if done else '0')
+
+    def is_done(self):
+        return self.redis.get(self._key('done')) == '1'
+
+    def close(self):
+        self.redis.close()
+
+def open_queue(url):
+    """根据地址打开队列后端：sqlite:///路径 或 redis://主机:端口/库"""
+    if url.startswith('sqlite:///'):
+        return SQLiteQueue(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisQueue(url)
+    raise ValueError(f"不支持的队列地址: {url}")
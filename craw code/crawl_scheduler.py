@@ -0,0 +1,244 @@
+import argparse
+import json
+import math
+import os
+import time
+from urllib.parse import urlparse
+
+# 调度状态文件
+STATE_FILE = 'scheduler_state.json'
+
+# 发布速率的Gamma先验：相当于“观察了7天，见到1条新政策”，避免新站点速率为0或无穷大
+PRIOR_NEW = 1.0
+PRIOR_DAYS = 7.0
+
+# 历史观测按时间衰减的半衰期（天），网站发布节奏变化后能较快适应
+HALF_LIFE_DAYS = 60.0
+
+# 每个网站的最低与最高访问频率（次/天）
+MIN_FREQUENCY = 1 / 30
+MAX_FREQUENCY = 24.0
+
+# 保留的历史访问记录条数
+MAX_HISTORY = 200
+
+DAY = 86400.0
+
+# 版本库中同一网站相邻两条新增记录相隔不超过该秒数时，视为同一次抓取
+SESSION_GAP = 3600.0
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {'hosts': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_FILE):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def host_entry(state, list_url):
+    host = urlparse(list_url).netloc.lower()
+    return state['hosts'].setdefault(host, {'url': list_url, 'visits': [], 'last_visit': None, 'next_visit': None})
+
+def record_visit(state, list_url, new_urls, visited_at=None):
+    """记录一次访问：距上次访问的间隔内新出现了多少条政策"""
+    entry = host_entry(state, list_url)
+    visited_at = visited_at or time.time()
+    if entry['last_visit'] is not None:
+        entry['visits'].append({
+            'at': visited_at,
+            'days': max((visited_at - entry['last_visit']) / DAY, 1e-3),
+            'new': new_urls
+        })
+        entry['visits'] = entry['visits'][-MAX_HISTORY:]
+    entry['last_visit'] = visited_at
+
+def estimate_rate(entry, now=None):
+    """估计网站的发布速率λ（条/天）
+
+    把发布视为泊松过程，新政策数与间隔天数按半衰期加权后，与Gamma先验合并求后验均值。
+    """
+    now = now or time.time()
+    new_total, days_total = PRIOR_NEW, PRIOR_DAYS
+    for visit in entry['visits']:
+        weight = 0.5 ** ((now - visit['at']) / DAY / HALF_LIFE_DAYS)
+        new_total += weight * visit['new']
+        days_total += weight * visit['days']
+    return new_total / days_total
+
+def freshness(rate, frequency):
+    """以频率f访问、按速率λ发布的网站的期望新鲜度 F = (f/λ)(1 - e^(-λ/f))"""
+    if frequency <= 0:
+        return 0.0
+    r = rate / frequency
+    return (1 - math.exp(-r)) / r
+
+def marginal_gain(rate, frequency):
+    """新鲜度对访问频率的导数 dF/df = (1 - e^(-r)(1 + r)) / λ，r = λ/f"""
+    r = rate / frequency
+    return (1 - math.exp(-r) * (1 + r)) / rate
+
+def frequency_for_gain(rate, gain):
+    """在给定边际收益下求最优访问频率（dF/df 随 f 单调递减，二分求解）"""
+    low, high = MIN_FREQUENCY, MAX_FREQUENCY
+    if marginal_gain(rate, low) <= gain:
+        return low
+    if marginal_gain(rate, high) >= gain:
+        return high
+    for _ in range(60):
+        mid = (low + high) / 2
+        if marginal_gain(rate, mid) > gain:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+def allocate_frequencies(rates, budget_per_day):
+    """在每天访问次数预算内分配各网站访问频率，使期望新鲜度之和最大
+
+    拉格朗日条件下各网站的边际收益相等，对公共边际收益μ二分，使频率之和等于预算。
+    """
+    if not rates:
+        return {}
+    floor = MIN_FREQUENCY * len(rates)
+    if budget_per_day <= floor:
+        return {host: MIN_FREQUENCY for host in rates}
+
+    low, high = 0.0, max(1 / rate for rate in rates.values())
+    for _ in range(80):
+        mu = (low + high) / 2
+        total = sum(frequency_for_gain(rate, mu) for rate in rates.values())
+        if total > budget_per_day:
+            low = mu
+        else:
+            high = mu
+    return {host: frequency_for_gain(rate, high) for host, rate in rates.items()}
+
+def plan(state, budget_per_day, now=None):
+    """重新计算各网站的发布速率、访问频率与下次计划访问时间"""
+    now = now or time.time()
+    rates = {host: estimate_rate(entry, now) for host, entry in state['hosts'].items()}
+    frequencies = allocate_frequencies(rates, budget_per_day)
+    for host, entry in state['hosts'].items():
+        entry['rate'] = rates[host]
+        entry['frequency'] = frequencies[host]
+        entry['expected_freshness'] = freshness(rates[host], frequencies[host])
+        if entry['last_visit'] is None:
+            entry['next_visit'] = now
+        else:
+            entry['next_visit'] = entry['last_visit'] + DAY / frequencies[host]
+    return state
+
+def bootstrap_from_store(state, websites, store_path):
+    """用版本库中的历史记录初始化各网站的发布速率
+
+    按新增记录的时间把历史划分为若干次抓取，每次抓取的最后一条记录时间视为访问时间。
+    """
+    import sqlite3
+
+    if not os.path.exists(store_path):
+        return
+    conn = sqlite3.connect(store_path)
+    rows = conn.execute(
+        "SELECT json_extract(metadata, '$.website'), changed_at FROM versions "
+        "WHERE change_type = 'new' ORDER BY 1, changed_at"
+    ).fetchall()
+    conn.close()
+
+    known = set(websites)
+    sessions = {}
+    for website, changed_at in rows:
+        if website not in known:
+            continue
+        changed_ts = time.mktime(time.strptime(changed_at, '%Y-%m-%d %H:%M:%S'))
+        website_sessions = sessions.setdefault(website, [])
+        if website_sessions and changed_ts - website_sessions[-1]['at'] <= SESSION_GAP:
+            website_sessions[-1]['at'] = changed_ts
+            website_sessions[-1]['new'] += 1
+        else:
+            website_sessions.append({'at': changed_ts, 'new': 1})
+
+    for website, website_sessions in sessions.items():
+        entry = host_entry(state, website)
+        if entry['last_visit'] is not None:
+            continue
+        # 首次抓取看到的是存量政策，整批不计入发布速率；之后每次抓取的新增数对应距上次抓取的间隔
+        for previous, session in zip(website_sessions, website_sessions[1:]):
+            entry['visits'].append({
+                'at': session['at'],
+                'days': max((session['at'] - previous['at']) / DAY, 1e-3),
+                'new': session['new']
+            })
+        entry['visits'] = entry['visits'][-MAX_HISTORY:]
+        entry['last_visit'] = website_sessions[-1]['at']
+
+def print_plan(state):
+    """输出各网站的速率估计与下次计划抓取时间"""
+    print(f"{'网站':<32}{'速率(条/天)':>12}{'频率(次/天)':>12}{'期望新鲜度':>10}  下次抓取")
+    for host, entry in sorted(state['hosts'].items(), key=lambda item: item[1]['next_visit'] or 0):
+        next_visit = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['next_visit'])) if entry['next_visit'] else '-'
+        print(f"{host:<32}{entry.get('rate', 0):>12.3f}{entry.get('frequency', 0):>12.3f}"
+              f"{entry.get('expected_freshness', 0):>10.2f}  {next_visit}")
+
+def run_scheduler(websites_file='websites.txt', budget_per_day=64, store_path='policy_versions.db',
+                  state_path=STATE_FILE, request_delay=1):
+    """常驻调度：每次抓取计划时间最早的网站，按新增政策数更新速率估计并持久化状态
+
+    每次访问只增量更新版本库与月份分区索引，不写进度文件和整批导出文件，长期运行时磁盘占用不随访问次数增长。
+    """
+    from craw_final import load_websites_from_file, recrawl_website
+
+    websites = load_websites_from_file(websites_file)
+    state = load_state(state_path)
+    for list_url in websites:
+        host_entry(state, list_url)
+    bootstrap_from_store(state, websites, store_path)
+
+    while True:
+        plan(state, budget_per_day)
+        save_state(state, state_path)
+        host, entry = min(state['hosts'].items(), key=lambda item: item[1]['next_visit'])
+        wait = entry['next_visit'] - time.time()
+        if wait > 0:
+            print(f"⏳ 下一次抓取 {host}，{wait / 60:.1f} 分钟后")
+            time.sleep(wait)
+
+        try:
+            policies = recrawl_website(entry['url'], request_delay, store_path)
+        except Exception as e:
+            # 抓取失败也记为一次访问（新增0条），避免同一网站被立即反复重试
+            print(f"❌ 抓取 {host} 时出错: {e}")
+            policies = []
+        new_urls = sum(1 for p in policies if p.get('change_type') == 'new')
+        record_visit(state, entry['url'], new_urls)
+        print(f"📅 {host} 本次新增 {new_urls} 条，速率估计 {estimate_rate(state['hosts'][host]):.3f} 条/天")
+
+def main():
+    parser = argparse.ArgumentParser(description='按网站发布速率安排重复抓取')
+    parser.add_argument('command', choices=['run', 'plan'])
+    parser.add_argument('--websites', default='websites.txt')
+    parser.add_argument('--budget', type=float, default=64, help='每天总访问次数预算')
+    parser.add_argument('--store', default='policy_versions.db')
+    parser.add_argument('--state', default=STATE_FILE)
+    parser.add_argument('--delay', type=float, default=1)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run_scheduler(args.websites, args.budget, args.store, args.state, args.delay)
+    else:
+        from craw_final import load_websites_from_file
+
+        websites = load_websites_from_file(args.websites)
+        state = load_state(args.state)
+        for list_url in websites:
+            host_entry(state, list_url)
+        bootstrap_from_store(state, websites, args.store)
+        plan(state, args.budget)
+        save_state(state, args.state)
+        print_plan(state)
+
+if __name__ == "__main__":
+    main()
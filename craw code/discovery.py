@@ -0,0 +1,245 @@
+import gzip
+import json
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+# 常见的sitemap与订阅源路径，robots.txt中未声明时逐个尝试
+KNOWN_FEED_PATHS = (
+    '/sitemap.xml',
+    '/sitemap_index.xml',
+    '/sitemap.xml.gz',
+    '/rss.xml',
+    '/rss',
+    '/feed',
+)
+
+# 各站点内部使用的检索JSON接口，按主机配置：{主机: {'url': 接口地址, 'items': 列表字段, 'fields': {url/title/lastmod: 字段名}}}
+SEARCH_ENDPOINTS = {}
+
+# 单个站点最多从订阅源中取出的条目数
+MAX_DISCOVERED = 1000
+
+# sitemap索引最多展开的层数
+MAX_SITEMAP_DEPTH = 2
+
+def normalize_lastmod(value):
+    """把W3C日期或RFC822日期统一为本地时间 'YYYY-MM-DD HH:MM:SS'，无法解析时返回None"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+def local_name(tag):
+    """去掉XML命名空间前缀"""
+    return tag.rsplit('}', 1)[-1]
+
+def open_stream(url, headers):
+    """流式打开远程XML，.gz文件边下载边解压"""
+    from craw_final import fetch_page, finish_fetch
+
+    response = fetch_page(url, headers, timeout=20, stream=True)
+    if response.status_code != 200:
+        finish_fetch(response, 0)
+        response.close()
+        return None, None
+    response.raw.decode_content = True
+    stream = response.raw
+    if urlparse(url).path.endswith('.gz'):
+        stream = gzip.GzipFile(fileobj=stream)
+    return response, stream
+
+def parse_feed(stream, url, nested):
+    """流式解析sitemap、sitemap索引、RSS或Atom，逐条产出 {'url', 'title', 'lastmod'}；子sitemap地址追加到 nested"""
+    import xml.etree.ElementTree as ET
+
+    entry = {}
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        name = local_name(elem.tag)
+        if event == 'start':
+            if name in ('url', 'sitemap', 'item', 'entry'):
+                entry = {}
+            continue
+
+        text = (elem.text or '').strip()
+        if name == 'loc' or (name == 'link' and text):
+            entry['url'] = text
+        elif name == 'link' and elem.get('href'):
+            entry['url'] = elem.get('href')
+        elif name == 'title':
+            entry['title'] = text
+        elif name in ('lastmod', 'pubDate', 'updated', 'published', 'date'):
+            entry['lastmod'] = normalize_lastmod(text)
+        elif name == 'sitemap':
+            # sitemap索引：子sitemap在本文件解析完后再递归展开
+            if entry.get('url'):
+                nested.append(urljoin(url, entry['url']))
+        elif name in ('url', 'item', 'entry'):
+            if entry.get('url'):
+                yield {
+                    'url': urljoin(url, entry['url']),
+                    'title': entry.get('title', ''),
+                    'lastmod': entry.get('lastmod')
+                }
+            elem.clear()
+
+def iter_feed_entries(url, headers, depth=0):
+    """下载并流式解析订阅源，sitemap索引中的子sitemap最多展开两层"""
+    from xml.etree.ElementTree import ParseError
+    from craw_final import finish_fetch
+
+    response, stream = open_stream(url, headers)
+    if response is None:
+        return
+    nested = []
+    try:
+        yield from parse_feed(stream, url, nested)
+    except ParseError as e:
+        print(f"⚠️ 订阅源解析失败 {url}: {e}")
+    finally:
+        # raw.tell() 为已从连接读取的字节数（.gz 为压缩后大小），提前停止读取时只计已读部分
+        finish_fetch(response, response.raw.tell())
+        response.close()
+
+    if depth < MAX_SITEMAP_DEPTH:
+        for child in nested:
+            yield from iter_feed_entries(child, headers, depth + 1)
+
+def iter_search_entries(host, headers):
+    """调用站点检索JSON接口获取文档列表"""
+    from craw_final import fetch_page
+
+    config = SEARCH_ENDPOINTS.get(host)
+    if not config:
+        return
+    response = fetch_page(config['url'], headers, timeout=20)
+    if response.status_code != 200:
+        return
+    items = response.json()
+    for key in config.get('items', '').split('.'):
+        if key:
+            items = items.get(key, [])
+    fields = config.get('fields', {})
+    for item in items:
+        url = item.get(fields.get('url', 'url'))
+        if url:
+            yield {
+                'url': urljoin(config['url'], url),
+                'title': item.get(fields.get('title', 'title'), ''),
+                'lastmod': normalize_lastmod(item.get(fields.get('lastmod', 'lastmod')))
+            }
+
+def find_feed_urls(site_url, headers):
+    """从robots.txt的Sitemap声明和常见路径中查找可用订阅源"""
+    import requests
+    from craw_final import fetch_page
+
+    feeds = []
+    try:
+        robots = fetch_page(urljoin(site_url, '/robots.txt'), headers, timeout=10)
+        if robots.status_code == 200:
+            for line in robots.text.splitlines():
+                if line.lower().startswith('sitemap:'):
+                    feeds.append(line.split(':', 1)[1].strip())
+    except requests.RequestException:
+        pass
+    if feeds:
+        return feeds
+
+    for path in KNOWN_FEED_PATHS:
+        url = urljoin(site_url, path)
+        try:
+            response = fetch_page(url, headers, timeout=10, method='HEAD', allow_redirects=True)
+        except requests.RequestException:
+            continue
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code == 200 and ('xml' in content_type or 'rss' in content_type or path.endswith('.gz')):
+            feeds.append(url)
+            break
+    return feeds
+
+def discover_entries(site_url, headers):
+    """流式产出站点订阅源与检索接口中的全部条目；站点没有任何订阅源时返回None"""
+    host = urlparse(site_url).netloc.lower()
+    feeds = find_feed_urls(site_url, headers)
+    if not feeds and host not in SEARCH_ENDPOINTS:
+        return None
+
+    def generate():
+        for feed in feeds:
+            yield from iter_feed_entries(feed, headers)
+        yield from iter_search_entries(host, headers)
+
+    return generate()
+
+def is_new_or_changed(entry, version_store):
+    """版本库中没有，或订阅源的lastmod晚于上次抓取时间，才需要抓取"""
+    last_seen = version_store.last_seen(entry['url'])
+    if last_seen is None:
+        return True
+    return bool(entry['lastmod'] and entry['lastmod'] > last_seen)
+
+def discover_policy_links(site_url, headers, version_store, keywords, limit=MAX_DISCOVERED):
+    """通过订阅源发现需要抓取的详情页，返回政策链接列表；站点无订阅源时返回None"""
+    entries = discover_entries(site_url, headers)
+    if entries is None:
+        return None
+
+    host = urlparse(site_url).netloc.lower()
+    policy_links = []
+    seen = set()
+    total = 0
+    for entry in entries:
+        total += 1
+        url = entry['url']
+        if url in seen:
+            continue
+        seen.add(url)
+        # 有标题按政策关键词过滤；sitemap通常无标题，只保留本站的网页地址，标题在详情页中补全
+        if entry['title']:
+            if not any(keyword in entry['title'] for keyword in keywords):
+                continue
+        elif urlparse(url).netloc.lower() != host or not urlparse(url).path.endswith(('.html', '.shtml', '.htm')):
+            continue
+        if is_new_or_changed(entry, version_store):
+            policy_links.append({'title': entry['title'], 'url': url, 'lastmod': entry['lastmod']})
+            if len(policy_links) >= limit:
+                break
+    print(f"🗺️ 订阅源共 {total} 条，其中 {len(policy_links)} 条为新增或已更新")
+    return policy_links
+
+def merge_list_links(discovered, list_links, version_store):
+    """在订阅源发现的链接后补上列表页中订阅源未列出、且版本库中从未抓取或跳过过的链接
+
+    订阅源可能只收录其他栏目，或是跨主机的门户sitemap，只看订阅源会漏掉列表页上的政策。
+    """
+    policy_links = list(discovered)
+    seen = {link['url'] for link in discovered}
+    for link in list_links:
+        if link['url'] not in seen and version_store.last_seen(link['url']) is None:
+            seen.add(link['url'])
+            policy_links.append(link)
+    return policy_links
+
+if __name__ == "__main__":
+    import sys
+
+    from craw_final import DEFAULT_HEADERS
+
+    # 用法: python discovery.py 网站地址 —— 列出该站点订阅源中的条目
+    entries = discover_entries(sys.argv[1], DEFAULT_HEADERS)
+    if entries is None:
+        print("该站点未发现sitemap或RSS")
+    else:
+        for entry in entries:
+            print(json.dumps(entry, ensure_ascii=False))
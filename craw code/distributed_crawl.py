@@ -0,0 +1,262 @@
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+
+from crawl_queue import HashRing, open_queue
+
+# 节点心跳间隔与判定失联的超时时间（秒）
+HEARTBEAT_INTERVAL = 3
+WORKER_TIMEOUT = 15
+
+DEFAULT_QUEUE = 'sqlite:///crawl_queue.db'
+
+def website_host(url):
+    """任务按所属网站的主机分片，同一网站的列表页与详情页落在同一节点"""
+    return urlparse(url).netloc.lower()
+
+def live_workers(queue, timeout=WORKER_TIMEOUT):
+    now = time.time()
+    return sorted(w for w, beat in queue.workers().items() if now - beat <= timeout)
+
+def seed_queue(queue, websites):
+    """清空上一轮状态，登记网站主机，载入版本库中的抓取记录并放入列表页任务
+
+    版本库只在协调节点上更新，各节点判断订阅源条目是否新增或更新时读取队列中的这份副本。
+    """
+    from version_store import PolicyVersionStore
+
+    queue.reset()
+    queue.add_hosts(sorted({website_host(url) for url in websites}))
+    version_store = PolicyVersionStore()
+    queue.load_last_seen(version_store.seen_pages())
+    version_store.close()
+    for list_url in websites:
+        queue.push({'kind': 'list', 'url': list_url, 'host': website_host(list_url), 'website': list_url})
+
+def start_heartbeat(queue_url, worker_id, stop_event):
+    """后台线程定期上报心跳，使用独立连接避免与抓取线程争用"""
+    def run():
+        queue = open_queue(queue_url)
+        while not stop_event.is_set():
+            queue.heartbeat(worker_id)
+            stop_event.wait(HEARTBEAT_INTERVAL)
+        queue.close()
+
+    thread = threading.Thread(target=run, name='heartbeat', daemon=True)
+    thread.start()
+    return thread
+
+def find_policy_links(list_url, queue):
+    """与单机爬取相同：通过订阅源发现新增或更新的详情页，并补上列表页中从未抓取过的链接"""
+    from craw_final import DEFAULT_HEADERS, POLICY_KEYWORDS, fetch_page, parse_html, extract_policy_links
+    from discovery import discover_policy_links, merge_list_links
+
+    try:
+        discovered = discover_policy_links(list_url, DEFAULT_HEADERS, queue, POLICY_KEYWORDS)
+    except Exception as e:
+        print(f"⚠️ 订阅源发现失败，改为爬取列表页: {e}")
+        discovered = None
+
+    try:
+        response = fetch_page(list_url, DEFAULT_HEADERS, timeout=15)
+        response.raise_for_status()
+    except Exception as e:
+        if discovered is None:
+            raise
+        print(f"⚠️ 列表页爬取失败，只抓取订阅源发现的政策: {e}")
+        return discovered
+    list_links = extract_policy_links(parse_html(response), list_url)
+    return list_links if discovered is None else merge_list_links(discovered, list_links, queue)
+
+def process_task(queue, task, extraction_pool):
+    """处理一个任务：列表页产出详情页任务，详情页产出政策记录；返回附件抽取进程池是否需要重建"""
+    from craw_final import (DEFAULT_HEADERS, fetch_page, parse_html, build_policy_info,
+                            is_policy_title, extract_page_title)
+    from attachments import find_attachment_links, submit_attachments, merge_attachment_text
+
+    if task['kind'] == 'list':
+        policy_links = find_policy_links(task['url'], queue)
+        added = sum(
+            queue.push({'kind': 'detail', 'url': p['url'], 'title': p['title'],
+                        'host': task['host'], 'website': task['website']})
+            for p in policy_links
+        )
+        print(f"📋 {task['url']} 找到 {len(policy_links)} 个政策链接，新增 {added} 个")
+        return
+
+    response = fetch_page(task['url'], DEFAULT_HEADERS, timeout=20)
+    if response.status_code != 200:
+        print(f"✗ 无法访问页面: {response.status_code} {task['url']}")
+        return
+    soup = parse_html(response)
+    if not task['title'] and not is_policy_title(extract_page_title(soup)):
+        # sitemap条目没有标题，按详情页标题过滤非政策页面
+        print(f"⏭️ 页面标题不含政策关键词，跳过 {task['url']}")
+        queue.mark_skipped(task['url'])
+        return
+    policy_info = build_policy_info(task, soup, response, task['website'])
+    attachments = find_attachment_links(soup, task['url'])
+    pool_broken = False
+    if attachments:
+        pending = submit_attachments(extraction_pool, policy_info, attachments, DEFAULT_HEADERS)
+        pool_broken = merge_attachment_text(policy_info, pending)
+    queue.save_result(policy_info)
+    print(f"✓ {policy_info['title'][:40]} 长度 {policy_info['content_length']}")
+    return pool_broken
+
+def run_worker(queue_url, worker_id=None, request_delay=1):
+    """工作节点：按一致性哈希领取分配给自己的主机任务，直到协调节点宣布结束"""
+    from attachments import create_extraction_pool
+    from crawl_metrics import start_metrics_dumper, dump_metrics
+
+    worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+    queue = open_queue(queue_url)
+    queue.heartbeat(worker_id)
+    stop_event = threading.Event()
+    start_heartbeat(queue_url, worker_id, stop_event)
+    # 各节点导出各自的指标文件，多个进程不会互相覆盖
+    metrics_file = f'crawl_metrics_{worker_id}.prom'
+    start_metrics_dumper(path=metrics_file)
+    extraction_pool = create_extraction_pool(1)
+    print(f"🛠️ 工作节点 {worker_id} 已启动")
+
+    try:
+        while not queue.is_done():
+            # 每轮按当前存活节点重建哈希环，节点失联后其主机自动转移
+            ring = HashRing(live_workers(queue))
+            task = queue.claim(worker_id, ring.hosts_for(worker_id, queue.hosts()))
+            if task is None:
+                time.sleep(1)
+                continue
+            try:
+                if process_task(queue, task, extraction_pool):
+                    print("⚠️ 附件抽取进程池异常，已重建")
+                    extraction_pool.shutdown(wait=False, cancel_futures=True)
+                    extraction_pool = create_extraction_pool(1)
+            except Exception as e:
+                print(f"✗ 任务失败 {task['url']}: {e}")
+            finally:
+                queue.complete(task)
+            time.sleep(request_delay)
+    finally:
+        stop_event.set()
+        extraction_pool.shutdown()
+        queue.close()
+        dump_metrics(metrics_file)
+    print(f"🏁 工作节点 {worker_id} 退出")
+
+def merge_results(queue):
+    """把各节点结果与跳过的页面合并写入版本库，并生成最终数据文件"""
+    from craw_final import save_final_data
+    from version_store import PolicyVersionStore
+
+    policy_data = queue.results()
+    version_store = PolicyVersionStore()
+    for url, seen_at in queue.skipped_pages().items():
+        version_store.mark_skipped(url, seen_at)
+    if not policy_data:
+        version_store.close()
+        print("未找到任何政策内容")
+        return
+    for policy_info in policy_data:
+        change_type, version = version_store.upsert(policy_info)
+        policy_info['version'] = version
+        policy_info['change_type'] = change_type
+    version_store.close()
+    save_final_data(policy_data)
+    print(f"\n🎉 爬取完成！总共爬取了 {len(policy_data)} 条政策信息")
+
+def run_coordinator(queue_url, websites_file='websites.txt', poll_interval=2):
+    """协调节点：放入种子任务，监控节点心跳并回收失联节点的任务，结束后合并结果"""
+    from craw_final import load_websites_from_file
+
+    websites = load_websites_from_file(websites_file)
+    if not websites:
+        print("没有找到可用的网站列表，程序退出")
+        return
+    queue = open_queue(queue_url)
+    seed_queue(queue, websites)
+    print(f"🧭 协调节点已放入 {len(websites)} 个网站，等待工作节点")
+    supervise(queue, poll_interval)
+    queue.close()
+
+def supervise(queue, poll_interval=2):
+    """监控节点心跳，回收失联节点的任务；队列清空后宣布结束并合并结果"""
+    known = set()
+    while True:
+        time.sleep(poll_interval)
+        now = time.time()
+        for worker_id, beat in queue.workers().items():
+            if now - beat > WORKER_TIMEOUT:
+                requeued = queue.remove_worker(worker_id)
+                known.discard(worker_id)
+                print(f"⚠️ 节点 {worker_id} 失联，{requeued} 个任务已放回队列，主机重新分配")
+        current = set(live_workers(queue))
+        if current != known:
+            print(f"👥 存活节点: {', '.join(sorted(current)) or '无'}")
+            known = current
+
+        pending, claimed = queue.counts()
+        if pending == 0 and claimed == 0:
+            break
+
+    queue.set_done()
+    merge_results(queue)
+
+def run_local(websites_file='websites.txt', workers=4, queue_path='crawl_queue.db', request_delay=1):
+    """单机模式：启动多个本地工作进程，以SQLite文件作为共享队列"""
+    from craw_final import load_websites_from_file
+
+    websites = load_websites_from_file(websites_file)
+    if not websites:
+        print("没有找到可用的网站列表，程序退出")
+        return
+    queue_url = f'sqlite:///{queue_path}'
+    queue = open_queue(queue_url)
+    seed_queue(queue, websites)
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(queue_url, f'local-{i}', request_delay), name=f'local-{i}')
+        for i in range(1, workers + 1)
+    ]
+    for process in processes:
+        process.start()
+    print(f"🧭 已放入 {len(websites)} 个网站，启动 {workers} 个本地工作进程")
+    supervise(queue)
+    for process in processes:
+        process.join()
+    queue.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='分布式政策爬取：协调节点与工作节点')
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    coordinator = subparsers.add_parser('coordinator', help='放入种子任务并监控工作节点')
+    coordinator.add_argument('--queue', default=DEFAULT_QUEUE, help='sqlite:///路径 或 redis://主机:端口/库')
+    coordinator.add_argument('--websites', default='websites.txt')
+
+    worker = subparsers.add_parser('worker', help='领取并执行分配给本节点的任务')
+    worker.add_argument('--queue', default=DEFAULT_QUEUE)
+    worker.add_argument('--id', default=None)
+    worker.add_argument('--delay', type=float, default=1)
+
+    local = subparsers.add_parser('local', help='单机启动协调节点和多个工作进程')
+    local.add_argument('--websites', default='websites.txt')
+    local.add_argument('--workers', type=int, default=4)
+    local.add_argument('--queue-file', default='crawl_queue.db')
+    local.add_argument('--delay', type=float, default=1)
+
+    args = parser.parse_args()
+    if args.mode == 'coordinator':
+        run_coordinator(args.queue, args.websites)
+    elif args.mode == 'worker':
+        run_worker(args.queue, args.id, args.delay)
+    else:
+        run_local(args.websites, args.workers, args.queue_file, args.delay)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import json
+import os
+import sys
+
+# 按月分区的索引目录
+INDEX_DIR = 'policy_index'
+MANIFEST_FILE = 'manifest.json'
+URL_MAP_FILE = 'url_partitions.json'
+
+# 发布日期未知的记录单独存放
+UNKNOWN_PARTITION = 'unknown'
+
+# 已打开的压缩语料库与版本库，按目录/路径缓存；批量读取正文时字典与URL索引只加载一次
+content_readers = {}
+content_stores = {}
+
+def index_record(policy, corpus_dir=None):
+    """索引中只保存元数据与正文位置：正文按URL从压缩语料库或版本库读取，不在索引中再存一份"""
+    record = {k: v for k, v in policy.items() if k != 'content'}
+    if corpus_dir:
+        record['corpus'] = corpus_dir
+    return record
+
+def record_content(record, store_path='policy_versions.db'):
+    """读取索引记录对应的正文：优先从记录指向的压缩语料库读取，否则读取版本库中的最新版本"""
+    corpus_dir = record.get('corpus')
+    if corpus_dir and os.path.isdir(corpus_dir):
+        if corpus_dir not in content_readers:
+            from corpus_store import CorpusReader
+
+            content_readers[corpus_dir] = CorpusReader(corpus_dir)
+        policy = content_readers[corpus_dir].get_by_url(record['url'])
+        if policy is not None:
+            return policy.get('content', '')
+
+    if store_path not in content_stores:
+        from version_store import PolicyVersionStore
+
+        content_stores[store_path] = PolicyVersionStore(store_path)
+    return content_stores[store_path].get_version(record['url'])
+
+def close_content_readers():
+    """关闭 record_content 缓存的语料库与版本库"""
+    for reader in content_readers.values():
+        reader.close()
+    for store in content_stores.values():
+        store.close()
+    content_readers.clear()
+    content_stores.clear()
+
+def partition_of(policy):
+    """按发布日期确定所属月份分区，如 2024-03"""
+    pub_date = policy.get('publication_date') or ''
+    if len(pub_date) >= 7 and pub_date[:4].isdigit() and pub_date[5:7].isdigit():
+        return pub_date[:7]
+    return UNKNOWN_PARTITION
+
+def partition_path(index_dir, partition):
+    return os.path.join(index_dir, f'{partition}.jsonl')
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def read_partition(index_dir, partition):
+    """读取单个分区的全部记录"""
+    path = partition_path(index_dir, partition)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def write_partition(index_dir, partition, records):
+    """按发布日期倒序重写分区，便于最新N条查询提前结束"""
+    path = partition_path(index_dir, partition)
+    if not records:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    records.sort(key=lambda p: p.get('publication_date') or '', reverse=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+
+def add_policies(policies, index_dir=INDEX_DIR, corpus_dir=None):
+    """把政策元数据写入对应月份分区，同一URL只保留最新记录；只重写涉及的分区"""
+    os.makedirs(index_dir, exist_ok=True)
+    url_map = load_json(os.path.join(index_dir, URL_MAP_FILE), {})
+    manifest = load_json(os.path.join(index_dir, MANIFEST_FILE), {})
+
+    incoming = {}
+    removals = {}
+    for policy in policies:
+        partition = partition_of(policy)
+        incoming.setdefault(partition, {})[policy['url']] = index_record(policy, corpus_dir)
+        previous = url_map.get(policy['url'])
+        # 日期修正后记录会换到新的分区，需要从旧分区删除
+        if previous and previous != partition:
+            removals.setdefault(previous, set()).add(policy['url'])
+        url_map[policy['url']] = partition
+
+    for partition in set(incoming) | set(removals):
+        updates = incoming.get(partition, {})
+        dropped = removals.get(partition, set())
+        records = [r for r in read_partition(index_dir, partition)
+                   if r['url'] not in updates and r['url'] not in dropped]
+        records.extend(updates.values())
+        write_partition(index_dir, partition, records)
+        if records:
+            dates = [r['publication_date'] for r in records if partition != UNKNOWN_PARTITION]
+            manifest[partition] = {
+                'count': len(records),
+                'min_date': min(dates) if dates else None,
+                'max_date': max(dates) if dates else None
+            }
+        else:
+            manifest.pop(partition, None)
+
+    write_json(os.path.join(index_dir, URL_MAP_FILE), url_map)
+    write_json(os.path.join(index_dir, MANIFEST_FILE), manifest)
+    return manifest
+
+def dated_partitions(index_dir):
+    manifest = load_json(os.path.join(index_dir, MANIFEST_FILE), {})
+    return sorted(p for p in manifest if p != UNKNOWN_PARTITION)
+
+def query_range(start, end, index_dir=INDEX_DIR):
+    """查询发布日期在 [start, end] 内的政策，只读取与区间重叠的月份分区"""
+    for partition in dated_partitions(index_dir):
+        if partition < start[:7] or partition > end[:7]:
+            continue
+        for record in reversed(read_partition(index_dir, partition)):
+            if start <= record['publication_date'] <= end:
+                yield record
+
+def newest(n, index_dir=INDEX_DIR):
+    """返回最新发布的N条政策，从最近月份开始读取，够数即停止"""
+    results = []
+    for partition in reversed(dated_partitions(index_dir)):
+        results.extend(read_partition(index_dir, partition))
+        if len(results) >= n:
+            break
+    return results[:n]
+
+if __name__ == "__main__":
+    # 用法:
+    #   python partition_index.py build 爬取结果JSON或压缩语料库目录
+    #   python partition_index.py range 2024-01-01 2024-03-31
+    #   python partition_index.py newest 10
+    if len(sys.argv) < 2:
+        print("用法: python partition_index.py build|range|newest ...")
+        sys.exit(1)
+    command = sys.argv[1]
+    if command == 'build':
+        from corpus_store import load_policies
+
+        corpus_dir = sys.argv[2] if os.path.isdir(sys.argv[2]) else None
+        manifest = add_policies(list(load_policies(sys.argv[2])), corpus_dir=corpus_dir)
+        print(f"🗓️ 索引共 {len(manifest)} 个分区，{sum(p['count'] for p in manifest.values())} 条记录")
+    elif command == 'range':
+        for record in query_range(sys.argv[2], sys.argv[3]):
+            print(f"{record['publication_date']}  {record['title']}  {record['url']}")
+    elif command == 'newest':
+        for record in newest(int(sys.argv[2]) if len(sys.argv) > 2 else 10):
+            print(f"{record['publication_date']}  {record['title']}  {record['url']}")
@@ -0,0 +1,98 @@
+import re
+from datetime import date
+
+# 发布日期前常见的标签
+DATE_LABELS = r'(?:发布时间|发布日期|成文日期|印发日期|发文日期|发表时间|日期|时间)'
+
+# 数字日期：2024-03-05、2024/3/5、2024.03.05、2024年3月5日
+NUMERIC_DATE = r'(\d{4})\s*(?:[-/.]|年)\s*(\d{1,2})\s*(?:[-/.]|月)\s*(\d{1,2})\s*日?'
+
+# 中文数字日期：二〇二四年三月五日（公文落款常见写法）
+CHINESE_DATE = r'([〇○零一二三四五六七八九]{4})年([一二三四五六七八九十]{1,3})月([一二三四五六七八九十]{1,3})日'
+
+# URL中的日期：/t20240305_123.html、/2024-03/05/、/202403/t...
+URL_PATTERNS = [
+    (re.compile(r'/t(\d{4})(\d{2})(\d{2})_'), 0.75),
+    (re.compile(r'/(\d{4})-(\d{2})/(\d{2})/'), 0.7),
+    (re.compile(r'/(\d{4})(\d{2})(\d{2})/'), 0.65),
+    (re.compile(r'/(\d{4})(\d{2})/'), 0.4),
+]
+
+CHINESE_DIGITS = {'〇': 0, '○': 0, '零': 0, '一': 1, '二': 2, '三': 3, '四': 4,
+                  '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+
+# 合理的发布日期范围，排除页面上的版权年份、电话号码等误匹配
+MIN_YEAR = 1949
+
+def chinese_to_int(text):
+    """把“二〇二四”“十二”“二十五”等中文数字转换为整数"""
+    if '十' in text:
+        tens, _, ones = text.partition('十')
+        return (CHINESE_DIGITS.get(tens, 1) if tens else 1) * 10 + (CHINESE_DIGITS.get(ones, 0) if ones else 0)
+    value = 0
+    for char in text:
+        value = value * 10 + CHINESE_DIGITS[char]
+    return value
+
+def make_date(year, month, day):
+    """校验并构造日期，非法日期返回None"""
+    try:
+        result = date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+    if result.year < MIN_YEAR or result > date.today():
+        return None
+    return result
+
+def dates_in_text(pattern, text, chinese=False):
+    """按顺序产出文本中匹配到的合法日期"""
+    for match in re.finditer(pattern, text):
+        groups = match.groups()
+        if chinese:
+            groups = [chinese_to_int(g) for g in groups]
+        result = make_date(*groups[-3:])
+        if result:
+            yield result
+
+def date_from_url(url):
+    """从URL路径中提取日期，返回 (日期, 置信度)"""
+    if not url:
+        return None, 0.0
+    for pattern, confidence in URL_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            groups = match.groups()
+            result = make_date(groups[0], groups[1], groups[2] if len(groups) > 2 else 1)
+            if result:
+                return result, confidence
+    return None, 0.0
+
+def normalize_publication_date(text, url=None):
+    """识别并规范化发布日期
+
+    依次尝试：带标签的数字日期、带标签的中文日期、URL中的日期、正文中的首个日期，
+    返回 (YYYY-MM-DD 或 None, 置信度0-1, 识别方式)。
+    """
+    text = text or ''
+    for pattern, chinese, method in (
+        (DATE_LABELS + r'\s*[:：]?\s*' + NUMERIC_DATE, False, 'label'),
+        (DATE_LABELS + r'\s*[:：]?\s*' + CHINESE_DATE, True, 'label_chinese'),
+    ):
+        for result in dates_in_text(pattern, text, chinese):
+            return result.isoformat(), 0.95, method
+
+    url_date, url_confidence = date_from_url(url)
+
+    # 公文落款的中文日期通常就是成文日期
+    chinese_dates = list(dates_in_text(CHINESE_DATE, text, chinese=True))
+    if chinese_dates:
+        confidence = 0.85 if url_date in (None, chinese_dates[-1]) else 0.7
+        return chinese_dates[-1].isoformat(), confidence, 'chinese'
+
+    if url_date:
+        return url_date.isoformat(), url_confidence, 'url'
+
+    for result in dates_in_text(NUMERIC_DATE, text):
+        return result.isoformat(), 0.5, 'text'
+
+    return None, 0.0, 'none'
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import sys
+import time
+import zlib
+
+# 政策领域自定义词典与分词缓存目录
+TERMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'policy_terms.txt')
+CACHE_DIR = 'token_cache'
+
+# 批量分词时每个进程一次处理的文档数
+BATCH_CHUNKSIZE = 16
+
+_segmenter = None
+_dictionary_fingerprint = None
+
+def load_terms(terms_file=TERMS_FILE):
+    """读取自定义词典，返回 [(词, 词频, 词性)]，跳过空行和注释"""
+    terms = []
+    if not os.path.exists(terms_file):
+        return terms
+    with open(terms_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split()
+            freq = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+            tag = parts[2] if len(parts) > 2 else None
+            terms.append((parts[0], freq, tag))
+    return terms
+
+def dictionary_fingerprint(terms_file=TERMS_FILE):
+    """词典指纹：词典内容或jieba版本变化时，旧缓存自动失效"""
+    global _dictionary_fingerprint
+    if _dictionary_fingerprint is None:
+        import jieba
+
+        digest = hashlib.sha256(jieba.__version__.encode('utf-8'))
+        if os.path.exists(terms_file):
+            with open(terms_file, 'rb') as f:
+                digest.update(f.read())
+        _dictionary_fingerprint = digest.hexdigest()[:16]
+    return _dictionary_fingerprint
+
+def get_segmenter():
+    """懒加载带自定义词典的jieba分词器（每个进程只初始化一次）"""
+    global _segmenter
+    if _segmenter is None:
+        try:
+            import jieba
+        except ImportError:
+            raise ImportError("分词服务需要 jieba，请先执行 pip install jieba")
+        segmenter = jieba.Tokenizer()
+        segmenter.initialize()
+        for word, freq, tag in load_terms():
+            segmenter.add_word(word, freq, tag)
+        _segmenter = segmenter
+    return _segmenter
+
+def tokenize(text):
+    """对文本分词，去掉空白词"""
+    return [token for token in get_segmenter().lcut(text or '') if token.strip()]
+
+def cache_path(text, cache_dir=CACHE_DIR):
+    """按 词典指纹+正文哈希 确定缓存文件位置，按哈希前两位分目录"""
+    digest = hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, dictionary_fingerprint(), digest[:2], digest + '.tok')
+
+def read_cache(path):
+    try:
+        with open(path, 'rb') as f:
+            data = zlib.decompress(f.read()).decode('utf-8')
+    except FileNotFoundError:
+        return None
+    return data.split('\n') if data else []
+
+def write_cache(path, tokens):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(zlib.compress('\n'.join(tokens).encode('utf-8')))
+    os.replace(tmp_path, path)
+
+def tokenize_cached(text, cache_dir=CACHE_DIR):
+    """带磁盘缓存的分词：同一正文只分词一次，之后直接读取词序列"""
+    path = cache_path(text, cache_dir)
+    tokens = read_cache(path)
+    if tokens is None:
+        tokens = tokenize(text)
+        write_cache(path, tokens)
+    return tokens
+
+def tokenize_batch(texts, processes=None, cache_dir=CACHE_DIR):
+    """批量分词：先查缓存，未命中的正文在进程池中并行分词后写回缓存，按输入顺序返回"""
+    texts = list(texts)
+    paths = [cache_path(text, cache_dir) for text in texts]
+    results = [read_cache(path) for path in paths]
+    misses = [i for i, tokens in enumerate(results) if tokens is None]
+
+    if misses:
+        if processes == 1 or len(misses) < BATCH_CHUNKSIZE:
+            segmented = [tokenize(texts[i]) for i in misses]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                segmented = list(pool.map(tokenize, [texts[i] for i in misses], chunksize=BATCH_CHUNKSIZE))
+        for i, tokens in zip(misses, segmented):
+            write_cache(paths[i], tokens)
+            results[i] = tokens
+    return results
+
+def tokenize_policies(path, processes=None, cache_dir=CACHE_DIR):
+    """对语料库中全部政策正文预先分词，供后续抽取、检索、去重等环节直接读取"""
+    from corpus_store import load_policies
+
+    policies = list(load_policies(path))
+    tokens = tokenize_batch([p.get('content', '') for p in policies], processes, cache_dir)
+    return sum(len(t) for t in tokens), len(policies)
+
+if __name__ == "__main__":
+    # 用法: python policy_tokenizer.py 爬取结果JSON或压缩语料库目录 [进程数]
+    if len(sys.argv) < 2:
+        print("用法: python policy_tokenizer.py 语料路径 [进程数]")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    token_count, doc_count = tokenize_policies(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    print(f"✂️ 已分词 {doc_count} 篇，共 {token_count} 个词，用时 {time.perf_counter() - start:.2f}s，缓存目录: {CACHE_DIR}")
@@ -0,0 +1,87 @@
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawl_archive import archive_key, read_archive
+
+def make_handler(snapshots, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+    """构造回放请求处理器：按快照返回页面，可注入延迟和错误"""
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_HEAD(self):
+            self.do_GET(head_only=True)
+
+        def do_GET(self, head_only=False):
+            with rng_lock:
+                delay = latency + rng.uniform(0, jitter)
+                roll = rng.random()
+            if delay:
+                time.sleep(delay)
+
+            # 错误注入：一半返回503，一半直接断开连接
+            if roll < error_rate / 2:
+                self.send_error(503, 'Injected error')
+                return
+            if roll < error_rate:
+                self.close_connection = True
+                return
+
+            # 代理模式下请求行是完整URL，直连模式下以Host头补全
+            url = self.path if '://' in self.path else f'http://{self.headers.get("Host", "")}{self.path}'
+            snapshot = snapshots.get(archive_key(url))
+            if snapshot is None:
+                self.send_error(404, 'Not in archive')
+                return
+
+            status, headers, body = snapshot
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if not head_only:
+                self.wfile.write(body)
+
+        def do_CONNECT(self):
+            # 回放只支持http，https请求应由 replay_url 降级
+            self.send_error(405, 'HTTPS tunnelling is not supported in replay mode')
+
+        def log_message(self, *args):
+            pass
+
+    return ReplayHandler
+
+def start_replay_server(archive_path, port=0, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+    """在后台线程启动回放服务器，返回 (服务器, 实际端口)"""
+    snapshots = read_archive(archive_path)
+    handler = make_handler(snapshots, latency, jitter, error_rate, seed)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, name='replay-server', daemon=True).start()
+    return server, server.server_address[1]
+
+def main():
+    parser = argparse.ArgumentParser(description='离线回放录制的政策网站快照')
+    parser.add_argument('archive', help='crawl_archive.py 录制的归档文件')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='额外随机延迟上限（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='注入错误的比例（0-1）')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server, port = start_replay_server(args.archive, args.port, args.latency, args.jitter, args.error_rate, args.seed)
+    print(f"🔁 回放服务器已启动: http://127.0.0.1:{port}（作为 HTTP_PROXY 使用，并设置 CRAWL_REPLAY=1）")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# 默认版本库文件
+VERSION_DB = 'policy_versions.db'
+
+# 规范化URL时丢弃的跟踪参数（按参数名精确匹配，from、fromId等可能标识页面的参数保留）
+TRACKING_PARAMS = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'spm'}
+
+def canonicalize_url(url):
+    """规范化URL：统一协议与主机大小写，去掉锚点、默认端口和跟踪参数，参数排序"""
+    parts = urlsplit(url.strip())
+    host = parts.hostname or ''
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path or '/'
+    return urlunsplit(('https', host.lower(), path, urlencode(query), ''))
+
+def content_hash(text):
+    """计算正文哈希，忽略空白差异，避免排版变动产生新版本"""
+    normalized = re.sub(r'\s+', ' ', text or '').strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def make_delta(old, new):
+    """按行生成从旧文本到新文本的紧凑差异，删除段保留原文以便反向还原
+
+    按字符比较的复杂度随正文长度平方增长，合并附件后的长文会拖慢写入，因此以行为单位比较，
+    '=' 记录相同的行数，'-'/'+' 记录删除或新增的行。
+    """
+    import difflib
+
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    delta = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append(['=', i2 - i1])
+            continue
+        if i2 > i1:
+            delta.append(['-', old_lines[i1:i2]])
+        if j2 > j1:
+            delta.append(['+', new_lines[j1:j2]])
+    return delta
+
+def apply_delta(old, delta):
+    """将差异应用到旧文本得到新文本"""
+    lines = old.splitlines(keepends=True)
+    pieces = []
+    pos = 0
+    for op, payload in delta:
+        if op == '=':
+            pieces.extend(lines[pos:pos + payload])
+            pos += payload
+        elif op == '-':
+            pos += len(payload)
+        else:
+            pieces.extend(payload)
+    return ''.join(pieces)
+
+def revert_delta(new, delta):
+    """将差异反向应用到新文本，还原出旧文本"""
+    inverted = [[{'-': '+', '+': '-'}.get(op, op), payload] for op, payload in delta]
+    return apply_delta(new, inverted)
+
+class PolicyVersionStore:
+    """按规范URL和内容哈希管理政策版本，只有内容变化时才写入新版本"""
+
+    def __init__(self, path=VERSION_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS documents (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS versions (
+                url TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                change_type TEXT NOT NULL,
+                changed_at TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                delta TEXT,
+                PRIMARY KEY (url, version)
+            );
+            CREATE INDEX IF NOT EXISTS idx_versions_changed_at ON versions(changed_at);
+            CREATE TABLE IF NOT EXISTS skipped_pages (
+                url TEXT PRIMARY KEY,
+                last_seen TEXT NOT NULL
+            );
+        ''')
+
+    def upsert(self, policy_info):
+        """写入一条抓取结果，返回 (变更类型, 版本号)，变更类型为 new/modified/unchanged"""
+        url = canonicalize_url(policy_info['url'])
+        content = policy_info['content']
+        digest = content_hash(content)
+        now = policy_info.get('crawl_time') or time.strftime('%Y-%m-%d %H:%M:%S')
+        metadata = json.dumps(
+            {k: v for k, v in policy_info.items() if k != 'content'}, ensure_ascii=False
+        )
+
+        row = self.conn.execute(
+            'SELECT content_hash, version, content FROM documents WHERE url = ?', (url,)
+        ).fetchone()
+
+        with self.conn:
+            if row is None:
+                self.conn.execute(
+                    'INSERT INTO documents VALUES (?, ?, 1, ?, ?, ?)', (url, digest, content, now, now)
+                )
+                self.conn.execute(
+                    'INSERT INTO versions VALUES (?, 1, ?, ?, ?, ?, NULL)', (url, digest, 'new', now, metadata)
+                )
+                return 'new', 1
+
+            old_hash, version, old_content = row
+            if old_hash == digest:
+                self.conn.execute('UPDATE documents SET last_seen = ? WHERE url = ?', (now, url))
+                return 'unchanged', version
+
+            version += 1
+            delta = json.dumps(make_delta(old_content, content), ensure_ascii=False)
+            self.conn.execute(
+                'UPDATE documents SET content_hash = ?, version = ?, content = ?, last_seen = ? WHERE url = ?',
+                (digest, version, content, now, url)
+            )
+            self.conn.execute(
+                'INSERT INTO versions VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, version, digest, 'modified', now, metadata, delta)
+            )
+            return 'modified', version
+
+    def get_version(self, url, version=None):
+        """读取指定版本的正文，默认返回最新版本；旧版本通过逐级反向应用差异还原"""
+        url = canonicalize_url(url)
+        row = self.conn.execute(
+            'SELECT version, content FROM documents WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        latest, content = row
+        if version is None or version == latest:
+            return content
+        if version < 1 or version > latest:
+            return None
+
+        deltas = self.conn.execute(
+            'SELECT delta FROM versions WHERE url = ? AND version > ? ORDER BY version DESC',
+            (url, version)
+        ).fetchall()
+        for (delta,) in deltas:
+            content = revert_delta(content, json.loads(delta))
+        return content
+
+    def last_seen(self, url):
+        """返回某页面最近一次被抓取的时间（含判定为非政策而跳过的页面），未抓取过时返回None"""
+        url = canonicalize_url(url)
+        row = self.conn.execute(
+            'SELECT last_seen FROM documents WHERE url = ? UNION ALL '
+            'SELECT last_seen FROM skipped_pages WHERE url = ?', (url, url)
+        ).fetchone()
+        return row[0] if row else None
+
+    def mark_skipped(self, url, seen_at=None):
+        """记录已抓取但不是政策的页面，订阅源lastmod未变化时不再重复抓取"""
+        seen_at = seen_at or time.strftime('%Y-%m-%d %H:%M:%S')
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO skipped_pages VALUES (?, ?)', (canonicalize_url(url), seen_at)
+            )
+
+    def seen_pages(self):
+        """返回全部已抓取页面（含跳过的页面）的 {规范URL: 最近抓取时间}"""
+        return dict(self.conn.execute(
+            'SELECT url, last_seen FROM documents UNION ALL SELECT url, last_seen FROM skipped_pages'
+        ))
+
+    def history(self, url):
+        """列出某政策的全部版本记录"""
+        rows = self.conn.execute(
+            'SELECT version, content_hash, change_type, changed_at FROM versions WHERE url = ? ORDER BY version',
+            (canonicalize_url(url),)
+        ).fetchall()
+        return [
+            {'version': v, 'content_hash': h, 'change_type': t, 'changed_at': at}
+            for v, h, t, at in rows
+        ]
+
+    def changes_since(self, since):
+        """查询某时间点之后新增或修改的政策，按changed_at索引扫描，耗时与变更数量成正比"""
+        rows = self.conn.execute(
+            'SELECT url, version, change_type, changed_at, metadata, delta FROM versions '
+            'WHERE changed_at >= ? ORDER BY changed_at',
+            (since,)
+        )
+        for url, version, change_type, changed_at, metadata, delta in rows:
+            yield {
+                'url': url,
+                'version': version,
+                'change_type': change_type,
+                'changed_at': changed_at,
+                'metadata': json.loads(metadata),
+                'delta': json.loads(delta) if delta else None
+            }
+
+    def close(self):
+        self.conn.close()
+
+if __name__ == "__main__":
+    # 用法: python version_store.py 2024-03-01 [版本库文件]
+    if len(sys.argv) < 2:
+        print("用法: python version_store.py 起始日期 [版本库文件]")
+        sys.exit(1)
+    store = PolicyVersionStore(sys.argv[2] if len(sys.argv) > 2 else VERSION_DB)
+    for change in store.changes_since(sys.argv[1]):
+        title = change['metadata'].get('title', '')
+        print(f"{change['changed_at']}  [{change['change_type']}] v{change['version']}  {title}  {change['url']}")
+    store.close()